@@ -0,0 +1,69 @@
+# command_sync.py
+
+import hashlib
+import json
+
+import discord
+
+from config import COMMAND_SYNC_PATH
+from storage import JsonStore, DocumentRow
+
+# Last synced fingerprint per "<application id>:<guild id or global>"
+sync_store = JsonStore(
+    COMMAND_SYNC_PATH,
+    default=dict,
+    indent=2,
+    layout=DocumentRow("command_sync"),
+)
+
+
+def _payload(command, tree):
+    try:
+        return command.to_dict(tree)
+    except TypeError:  # discord.py < 2.4 takes no tree argument
+        return command.to_dict()
+
+
+def tree_fingerprint(tree, guild=None):
+    """Stable hash of the commands Discord would receive for ``guild``.
+
+    Uses the same payload ``tree.sync()`` uploads (names, descriptions,
+    parameters, choices, permissions), with commands and keys sorted so the
+    hash doesn't depend on registration order.
+    """
+    payloads = sorted(
+        (_payload(command, tree) for command in tree.get_commands(guild=guild)),
+        key=lambda p: (p.get("type", 1), p["name"]),
+    )
+    blob = json.dumps(payloads, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+async def sync_commands(tree, guild_id=None, force=False):
+    """Sync the command tree only when it differs from the last sync.
+
+    With ``guild_id`` the global commands are copied to that guild and
+    synced there, which Discord applies instantly (for development).
+    Returns the number of synced commands, or None when skipped or failed.
+    """
+    guild = discord.Object(id=guild_id) if guild_id else None
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+    # Keyed by application too, so switching bot tokens never skips a sync
+    scope = f"{tree.client.application_id}:{guild_id or 'global'}"
+
+    fingerprint = tree_fingerprint(tree, guild)
+    if not force and sync_store.all().get(scope) == fingerprint:
+        print(f"✅ Slash commands unchanged ({scope}); skipping sync.")
+        return None
+
+    try:
+        synced = await tree.sync(guild=guild)
+    except discord.HTTPException as e:
+        print(f"❌ Error syncing slash commands: {e}")
+        return None
+
+    sync_store.set([scope], fingerprint)
+    await sync_store.aflush()
+    print(f"🔁 Synced {len(synced)} slash commands ({scope}).")
+    return len(synced)
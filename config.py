@@ -5,3 +5,11 @@ import os
 TOKEN = os.environ.get("DISCORD_TOKEN")  # Set this in your environment
 WAR_LOG_PATH = "warlog.json"
 GM_ROLE_NAME = "GM (Game Managers)"
+
+# Persistence backend: "json" (snapshot + journal files) or "sqlite"
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "json")
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "/data/archivist.db")
+
+# Slash command sync: set DEV_GUILD_ID to sync to one guild instantly while developing
+DEV_GUILD_ID = int(os.environ["DEV_GUILD_ID"]) if os.environ.get("DEV_GUILD_ID") else None
+COMMAND_SYNC_PATH = os.environ.get("COMMAND_SYNC_PATH", "/data/command_sync.json")
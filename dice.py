@@ -0,0 +1,303 @@
+# dice.py
+
+import asyncio
+import functools
+import random
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from math import comb
+
+try:
+    import numpy as np
+except ImportError:  # optional: batched sampling falls back to random
+    np = None
+
+MAX_DICE = 100
+MAX_SIDES = 1000
+MAX_TERMS = 20
+# Exact distributions beyond these sizes are refused rather than computed slowly
+MAX_PLAIN_WORK = 5_000_000  # dice * dice * sides for plain NdM
+MAX_KEEP_DICE = 20
+MAX_KEEP_SIDES = 100
+# Convolving terms together costs the product of their ranges
+MAX_SUPPORT = 1_000_000
+# Sampled estimates draw at most this many dice in total
+MAX_SAMPLE_DICE = 2_000_000
+
+# Odds are computed on their own threads, never on the storage IO pool
+DICE_WORKERS = 2
+_dice_pool = ThreadPoolExecutor(max_workers=DICE_WORKERS, thread_name_prefix="dice")
+
+_TERM = re.compile(
+    r"\s*([+-])?\s*(?:(\d*)\s*[dD]\s*(\d+)(?:\s*(kh|kl|dh|dl)\s*(\d+))?|(\d+))\s*"
+)
+
+Roll = namedtuple("Roll", ["total", "dice"])
+
+
+class DiceTerm:
+    """``count`` dice with ``sides`` faces, keeping ``keep`` of them.
+
+    ``keep`` is None (keep all) or ("high" | "low", k); drop-lowest/highest
+    are stored as the equivalent keep-highest/lowest.
+    """
+
+    def __init__(self, count, sides, keep=None):
+        self.count = count
+        self.sides = sides
+        self.keep = keep
+
+    def __repr__(self):
+        text = f"{self.count}d{self.sides}"
+        if self.keep:
+            text += ("kh" if self.keep[0] == "high" else "kl") + str(self.keep[1])
+        return text
+
+    def _kept(self, rolls):
+        if self.keep is None:
+            return rolls
+        order = sorted(rolls, reverse=self.keep[0] == "high")
+        return order[: self.keep[1]]
+
+    def roll(self, rng):
+        rolls = [rng.randint(1, self.sides) for _ in range(self.count)]
+        return sum(self._kept(rolls)), rolls
+
+    def sample(self, n, rng):
+        if np is not None:
+            rolls = rng.integers(1, self.sides + 1, size=(n, self.count))
+            if self.keep is not None:
+                rolls = np.sort(rolls, axis=1)
+                k = self.keep[1]
+                rolls = rolls[:, -k:] if self.keep[0] == "high" else rolls[:, :k]
+            return rolls.sum(axis=1)
+        faces = range(1, self.sides + 1)
+        flat = rng.choices(faces, k=n * self.count)
+        if self.keep is None and self.count == 1:
+            return flat
+        return [
+            sum(self._kept(flat[i:i + self.count]))
+            for i in range(0, len(flat), self.count)
+        ]
+
+    def counts(self):
+        """Exact {total: ways} over all ``sides ** count`` outcomes."""
+        if self.keep is None:
+            if self.count * self.count * self.sides > MAX_PLAIN_WORK:
+                raise ValueError(f"{self} is too large for an exact distribution")
+            return _sum_counts(self.count, self.sides)
+        if self.count > MAX_KEEP_DICE or self.sides > MAX_KEEP_SIDES:
+            raise ValueError(f"{self} is too large for an exact distribution")
+        return _keep_counts(self.count, self.sides, self.keep[1], self.keep[0] == "high")
+
+
+@lru_cache(maxsize=256)
+def _sum_counts(count, sides):
+    """Ways to roll each total on ``count``d``sides``: repeated convolution
+    with one die, using a sliding window so each step is linear."""
+    ways = {0: 1}
+    for _ in range(count):
+        low, high = min(ways), max(ways)
+        dense = [ways.get(t, 0) for t in range(low, high + 1)]
+        prefix = [0]
+        for w in dense:
+            prefix.append(prefix[-1] + w)
+        new = {}
+        for total in range(low + 1, high + sides + 1):
+            # dense index range contributing to ``total``: total - sides .. total - 1
+            lo = max(total - sides - low, 0)
+            hi = min(total - 1 - low, len(dense) - 1)
+            if lo <= hi:
+                new[total] = prefix[hi + 1] - prefix[lo]
+        ways = new
+    return ways
+
+
+@lru_cache(maxsize=256)
+def _keep_counts(count, sides, keep, highest):
+    """Ways to roll each kept total when keeping the ``keep`` highest
+    (or lowest) of ``count``d``sides``.
+
+    Walks the faces from the kept end, choosing how many dice show each
+    face; the state is (dice placed, dice kept) -> {kept total: ways}.
+    """
+    faces = range(sides, 0, -1) if highest else range(1, sides + 1)
+    states = {(0, 0): {0: 1}}
+    for face in faces:
+        new = {}
+        for (placed, kept), totals in states.items():
+            remaining = count - placed
+            for c in range(remaining + 1):
+                take = min(c, keep - kept)
+                key = (placed + c, kept + take)
+                weight = comb(remaining, c)
+                bucket = new.setdefault(key, {})
+                for total, ways in totals.items():
+                    t = total + take * face
+                    bucket[t] = bucket.get(t, 0) + ways * weight
+        states = new
+    return dict(sorted(states.get((count, min(keep, count)), {}).items()))
+
+
+class DiceExpr:
+    """A compiled dice expression: signed dice terms plus a flat bonus."""
+
+    def __init__(self, text, terms, bonus, max_sides=MAX_SIDES):
+        self.text = text
+        self.terms = terms  # [(sign, DiceTerm)]
+        self.bonus = bonus
+        self.max_sides = max_sides
+
+    def __repr__(self):
+        return f"DiceExpr({self.text!r})"
+
+    @property
+    def minimum(self):
+        return self.bonus + sum(
+            sign * (_kept_count(t) if sign > 0 else _kept_count(t) * t.sides) for sign, t in self.terms
+        )
+
+    @property
+    def maximum(self):
+        return self.bonus + sum(
+            sign * (_kept_count(t) * t.sides if sign > 0 else _kept_count(t)) for sign, t in self.terms
+        )
+
+    def roll(self, rng=random):
+        """One roll: Roll(total, [(term, every die rolled), ...])."""
+        total, dice = self.bonus, []
+        for sign, term in self.terms:
+            value, rolls = term.roll(rng)
+            total += sign * value
+            dice.append((term, rolls))
+        return Roll(total, dice)
+
+    @property
+    def dice_count(self):
+        return sum(t.count for _, t in self.terms)
+
+    def support(self):
+        """Product of the terms' ranges: the cost of an exact distribution."""
+        size = 1
+        for _, term in self.terms:
+            size *= _kept_count(term) * (term.sides - 1) + 1
+        return size
+
+    def sample(self, n, seed=None):
+        """``n`` totals at once; a NumPy array when available, else a list."""
+        if np is not None:
+            rng = np.random.default_rng(seed)
+            totals = np.full(n, self.bonus, dtype=np.int64)
+            for sign, term in self.terms:
+                totals += sign * term.sample(n, rng)
+            return totals
+        rng = random.Random(seed)
+        totals = [self.bonus] * n
+        for sign, term in self.terms:
+            column = term.sample(n, rng)
+            totals = [t + sign * v for t, v in zip(totals, column)]
+        return totals
+
+    def distribution(self):
+        """Exact {total: probability}, convolving the terms' distributions."""
+        return _distribution(self.text, self.max_sides)
+
+
+def _kept_count(term):
+    return term.count if term.keep is None else min(term.keep[1], term.count)
+
+
+@lru_cache(maxsize=256)
+def _distribution(text, max_sides=MAX_SIDES):
+    expr = compile_dice(text, max_sides)
+    if expr.support() > MAX_SUPPORT:
+        raise ValueError(f"{text} is too large for an exact distribution")
+    ways, outcomes = {expr.bonus: 1}, 1
+    for sign, term in expr.terms:
+        term_ways = term.counts()
+        outcomes *= term.sides ** term.count
+        combined = {}
+        for total, w in ways.items():
+            for value, v in term_ways.items():
+                t = total + sign * value
+                combined[t] = combined.get(t, 0) + w * v
+        ways = combined
+    return {total: w / outcomes for total, w in sorted(ways.items())}
+
+
+@lru_cache(maxsize=512)
+def compile_dice(text, max_sides=MAX_SIDES):
+    """Parse ``text`` (e.g. ``3d6+2``, ``2d10kh1``, ``4d6dl1``) once and
+    cache the result. Raises ValueError on anything it can't read.
+
+    ``max_sides=None`` lifts the die size cap, for trusted rolls such as
+    stat changes that run into the thousands.
+    """
+    source = text.strip()
+    if not source:
+        raise ValueError("empty dice expression")
+
+    terms, bonus, pos = [], 0, 0
+    while pos < len(source):
+        match = _TERM.match(source, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"can't read `{source[pos:]}`")
+        if terms or bonus or pos:
+            if not match.group(1):
+                raise ValueError(f"expected + or - before `{source[pos:].strip()}`")
+        pos = match.end()
+        sign = -1 if match.group(1) == "-" else 1
+
+        if match.group(6) is not None:
+            bonus += sign * int(match.group(6))
+            continue
+
+        count = int(match.group(2) or 1)
+        sides = int(match.group(3))
+        if not 1 <= count <= MAX_DICE:
+            raise ValueError(f"roll between 1 and {MAX_DICE} dice at a time")
+        if sides < 1:
+            raise ValueError("dice need at least 1 side")
+        if max_sides is not None and sides > max_sides:
+            raise ValueError(f"dice need between 1 and {max_sides} sides")
+
+        keep = None
+        if match.group(4):
+            n = int(match.group(5))
+            if not 0 < n <= count:
+                raise ValueError(f"can't {match.group(4)} {n} of {count} dice")
+            mode = match.group(4)
+            if mode == "kh":
+                keep = ("high", n)
+            elif mode == "kl":
+                keep = ("low", n)
+            elif n == count:
+                raise ValueError(f"dropping all {count} dice leaves nothing to roll")
+            elif mode == "dl":
+                keep = ("high", count - n)
+            else:
+                keep = ("low", count - n)
+        terms.append((sign, DiceTerm(count, sides, keep)))
+        if len(terms) > MAX_TERMS:
+            raise ValueError(f"at most {MAX_TERMS} dice terms")
+
+    return DiceExpr(source, terms, bonus, max_sides)
+
+
+async def run_dice(func, *args, **kwargs):
+    """Run a distribution or sampling job on the dice pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_dice_pool, functools.partial(func, *args, **kwargs))
+
+
+def roll(text, rng=random):
+    return compile_dice(text).roll(rng)
+
+
+def stats(distribution):
+    """(mean, standard deviation) of a {total: probability} distribution."""
+    mean = sum(t * p for t, p in distribution.items())
+    variance = sum((t - mean) ** 2 * p for t, p in distribution.items())
+    return mean, variance ** 0.5
@@ -1,18 +1,29 @@
+import asyncio
 import os
+import signal
+import time
 import discord # type: ignore
 from discord.ext import commands # type: ignore
 
 from utils import setup_logging
-import modules.war.war_commands
-import modules.misc
-import modules.war.war_view
-import modules.war.war_ledger
-import modules.civil.country_queries
-import modules.civil.country_register
-import modules.civil.year_tracker
-import modules.civil.country_modifiers
-import modules.debug_commands
+from storage import load_all, flush_all
+from command_sync import sync_commands
+from config import DEV_GUILD_ID
+from modules.civil.country_store import on_tier_crossing
+from modules.war.war_registry import war_registry
 
+# Extensions loaded at startup, in order; each module defines ``async def setup(bot)``
+EXTENSIONS = [
+    "modules.war.war_commands",
+    "modules.misc",
+    "modules.war.war_view",
+    "modules.war.war_ledger",
+    "modules.civil.country_queries",
+    "modules.civil.country_register",
+    "modules.civil.year_tracker",
+    "modules.civil.country_modifiers",
+    "modules.debug_commands",
+]
 
 
 TOKEN = os.getenv("DISCORD_TOKEN")
@@ -21,45 +32,60 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True  # ✅ Required for role-based logic
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class ArchivistBot(commands.Bot):
+    async def setup_hook(self):
+        # Runs once after login, before the gateway connects, never on reconnects
+        for name in EXTENSIONS:
+            started = time.perf_counter()
+            await self.load_extension(name)
+            print(f"Loaded {name} in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        await self.warm_up()
+
+        # Sync only when the command tree actually changed since the last sync
+        await sync_commands(self.tree, DEV_GUILD_ID)
+
+    async def warm_up(self):
+        """Load every ledger concurrently (off the event loop) and build the
+        search indexes, so the first commands don't pay for it."""
+        started = time.perf_counter()
+        timings = await load_all()  # country index is rebuilt by its load listener
+        for path, seconds in timings.items():
+            print(f"Loaded {path} in {seconds * 1000:.0f} ms")
+        war_registry.active()  # builds the war index and its search indexes
+        print(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+bot = ArchivistBot(command_prefix="!", intents=intents)
+
+# Surface tier changes as a bot event: @bot.event async def on_tier_crossing(...)
+on_tier_crossing(lambda *event: bot.dispatch("tier_crossing", *event))
 
 @bot.event
 async def on_ready():
-    await bot.wait_until_ready()
-    try:
-        synced = await bot.tree.sync()
-        print(f"Synced {len(synced)} slash commands.")
-    except Exception as e:
-        print(f"Error syncing commands: {e}")
     print(f"Logged in as {bot.user}! The Archivist awaits...")
 
 
 async def main():
     setup_logging()
 
-    # Sync regular (non-async) cogs
-    modules.war.war_commands.setup(bot)
-    modules.misc.setup(bot)
-    modules.war.war_view.setup(bot)
-    modules.war.war_ledger.setup(bot)
+    # Railway stops the container with SIGTERM on redeploy: close the bot so
+    # the flush below still runs
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(bot.close()))
+        except NotImplementedError:  # Windows event loops have no signal handlers
+            pass
 
-    # Sync async cogs
-    await modules.civil.country_queries.setup(bot)
-    await modules.civil.country_register.setup(bot)
-    await modules.civil.year_tracker.setup(bot)
-    await modules.civil.country_modifiers.setup(bot)
-    await modules.debug_commands.setup(bot)
-
-    # Slash sync comes LAST
+    # Extensions, ledgers and command sync are handled in setup_hook
     try:
-        synced = await bot.tree.sync()
-        print(f"🔁 Synced {len(synced)} slash commands.")
-    except Exception as e:
-        print(f"❌ Error syncing slash commands: {e}")
-
-    await bot.start(TOKEN)
+        await bot.start(TOKEN)
+    finally:
+        # Write out anything still waiting in the write-behind buffer
+        await flush_all()
 
 
 if __name__ == "__main__":
-    import asyncio
     asyncio.run(main())
@@ -1,36 +1,77 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-from discord import Interaction
-import os
-import json
-import random
-
-DATA_PATH = "/data/countries.json"
-
-# === Load Countries Safely ===
-def load_countries():
-    # Ensure file exists before trying to read it
-    if not os.path.exists(DATA_PATH):
-        with open(DATA_PATH, "w") as f:
-            json.dump({}, f)  # Start with an empty dict if file is missing
-
-    with open(DATA_PATH, "r") as f:
-        return json.load(f)
-
-# === Save Countries ===
-def save_countries(data):
-    with open(DATA_PATH, "w") as f:
-        json.dump(data, f, indent=4)
-
-# === Country Name Autocomplete (for slash commands) ===
-async def autocomplete_country_names(interaction: Interaction, current: str):
-    data = load_countries()
-    return [
-        app_commands.Choice(name=name, value=name)
-        for name in data
-        if current.lower() in name.lower()
-    ][:25]  # Discord's autocomplete limit
+import io
+
+from modules.civil.country_store import country_store, autocomplete_country_names, suggest_countries
+from dice import compile_dice
+from storage import run_io
+from utils import did_you_mean, parse_rows
+
+# Stat names accepted by /bulkmodify, mapped to their field in the ledger
+STAT_FIELDS = {
+    "eco": "economy.value",
+    "economy": "economy.value",
+    "stability": "stability.value",
+    "moral": "morale",
+    "morale": "morale",
+    "supply": "supply",
+    "military": "military_strength.value",
+}
+BULK_FIELDS = ("country", "stat", "amount", "method")
+MAX_BULK_BYTES = 10 * 2**20
+SUGGESTIONS_SHOWN = 15  # "did you mean" lookups for unknown countries, per batch
+
+
+# === Bulk Modification ===
+def prepare_bulk(sources, countries):
+    """Parse, validate and roll /bulkmodify rows.
+
+    Runs in the IO pool. ``sources`` is a list of (label, text or bytes);
+    each is parsed on its own, so it picks its own format and keeps its own
+    line numbers. ``countries`` is a snapshot of the registered names.
+    Returns ``([(country, category, result), ...], [(error, unknown country
+    or None), ...])``.
+    """
+    changes, errors = [], []
+    for label, source in sources:
+        if isinstance(source, bytes):
+            source = io.TextIOWrapper(io.BytesIO(source), encoding="utf-8-sig", errors="replace", newline="")
+        for line, row, error in parse_rows(source, BULK_FIELDS):
+            change, unknown = None, None
+            if error is None:
+                change, error, unknown = _bulk_change(countries, row)
+            if error:
+                errors.append((f"{label} {line}: {error}", unknown))
+            else:
+                changes.append(change)
+    return changes, errors
+
+
+def _bulk_change(countries, row):
+    """Validate one row and roll it: (change, error, unknown country)."""
+    country = str(row["country"] or "").strip()
+    if country not in countries:
+        return None, f"no record of **{country}**.", country
+
+    category = STAT_FIELDS.get(str(row["stat"] or "").strip().lower())
+    if category is None:
+        return None, f"unknown stat `{row['stat']}` (use {', '.join(STAT_FIELDS)})", None
+
+    try:
+        amount = int(row["amount"])
+    except (TypeError, ValueError):
+        return None, f"amount `{row['amount']}` is not a whole number", None
+
+    method = str(row["method"] or "flat").strip().lower()
+    if method == "roll":
+        try:
+            return (country, category, compile_dice(f"1d{amount}", max_sides=None).roll().total), None, None
+        except ValueError as e:
+            return None, f"can't roll 1d{amount}: {e}", None
+    if method != "flat":
+        return None, f"method must be flat or roll, not `{method}`", None
+    return (country, category, amount), None, None
 
 
 class CountryModifiers(commands.Cog):
@@ -39,11 +80,9 @@ class CountryModifiers(commands.Cog):
 
     # === Generic Modifier Command Generator ===
     async def modify_stat(self, interaction, country, category, amount, method):
-        countries = load_countries()
-        data = countries.get(country)
-
-        if not data:
-            await interaction.response.send_message(f"❌ No record of **{country}** found.", ephemeral=True)
+        # No auto-correction here: a typo must never edit the wrong nation
+        if not country_store.get(country):
+            await interaction.response.send_message(f"❌ No record of **{country}** found.{did_you_mean(suggest_countries(country))}", ephemeral=True)
             return
 
         # GM check
@@ -52,10 +91,22 @@ class CountryModifiers(commands.Cog):
             return
 
         if method == "roll":
-            result = random.randint(1, amount)
+            # Any size: economy alone runs into the thousands, past dice.MAX_SIDES
+            try:
+                result = compile_dice(f"1d{amount}", max_sides=None).roll().total
+            except ValueError as e:
+                await interaction.response.send_message(f"❌ Can't roll 1d{amount}: {e}.", ephemeral=True)
+                return
         else:
             result = amount
 
+        # Read-modify-write with no await in between: the in-memory store
+        # already serializes it against other commands
+        data = country_store.get(country)
+        if not data:
+            await interaction.response.send_message(f"❌ No record of **{country}** found.", ephemeral=True)
+            return
+
         # Apply change
         stat_path = category.split(".")
         target = data
@@ -64,22 +115,109 @@ class CountryModifiers(commands.Cog):
         target_field = stat_path[-1]
 
         # 🛡 Safe numeric check
-        if isinstance(target.get(target_field), (int, float)):
-           target[target_field] += result
+        current = target.get(target_field)
+        if isinstance(current, (int, float)):
+           new_value = current + result
         else:
-          target[target_field] = result  # fallback assignment if the field isn't a number
+          new_value = result  # fallback assignment if the field isn't a number
 
-        # Update file
-        countries[country] = data
-        save_countries(countries)
+        # Journal just this field instead of rewriting the whole file;
+        # the store re-tiers the stat itself
+        old_tier = target.get("tier")
+        country_store.set([country, *stat_path], new_value)
+        new_tier = target.get("tier")
 
         await interaction.response.send_message(
           f"📈 {category.replace('.', ' ').title()} for **{country}** modified by **{result}**.",
          ephemeral=False
         )
 
-        await interaction.user.send(f"🕵️ GM Log: {country}'s {category} is now {target[target_field]}")
+        log = f"🕵️ GM Log: {country}'s {category} is now {new_value}"
+        if old_tier != new_tier:
+            log += f" (tier: {old_tier} → {new_tier})"
+        await interaction.user.send(log)
+
 
+    # === /bulkmodify Command ===
+    @app_commands.command(name="bulkmodify", description="GM: Apply many stat changes at once.")
+    @app_commands.describe(
+        operations="Rows of country, stat, amount, flat/roll separated by ';' (e.g. Rome, eco, 20, roll; Gaul, supply, -5)",
+        file="CSV (country,stat,amount,method) or JSON lines upload"
+    )
+    async def bulkmodify(self, interaction: discord.Interaction, operations: str = "", file: discord.Attachment = None):
+        if not any(role.name == "GM (Game Managers)" for role in interaction.user.roles):
+            await interaction.response.send_message("❌ Only GMs may alter the course of nations.", ephemeral=True)
+            return
+
+        if not operations.strip() and file is None:
+            await interaction.response.send_message("❌ Provide operations or attach a CSV/JSONL file.", ephemeral=True)
+            return
+        if file is not None and file.size > MAX_BULK_BYTES:
+            await interaction.response.send_message("❌ That file is too large to apply.", ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        # Inline rows and the upload are parsed separately: each picks its own
+        # format, and errors point at the upload's own line numbers
+        sources = []
+        if operations.strip():
+            sources.append(("Row", operations.replace(";", "\n")))
+        if file is not None:
+            sources.append(("File line", await file.read()))
+
+        # Validate and roll every row off the loop, against one snapshot of the names
+        changes, problems = await run_io(prepare_bulk, sources, frozenset(country_store.names()))
+        errors = [
+            error + (did_you_mean(suggest_countries(unknown)) if unknown and i < SUGGESTIONS_SHOWN else "")
+            for i, (error, unknown) in enumerate(problems)
+        ]
+
+        results = {}
+        # No awaits from here on: the batch can't interleave with other commands,
+        # and it lands as one write-behind flush
+        for country, category, result in changes:
+            data = country_store.get(country)
+            if data is None:
+                errors.append(f"{country}: removed while the batch was being checked")
+                continue
+            stat_path = category.split(".")
+            target = data
+            for key in stat_path[:-1]:
+                target = target.get(key) if isinstance(target, dict) else None
+            if not isinstance(target, dict):
+                # Creating the record here would bypass the journal
+                errors.append(f"{country}: no {stat_path[0]} record to modify")
+                continue
+            current = target.get(stat_path[-1])
+            new_value = current + result if isinstance(current, (int, float)) else result
+            country_store.set([country, *stat_path], new_value)
+            results.setdefault((country, category), []).append(result)
+
+        summary = [
+            f"**{country}** {category.replace('.', ' ').title()}: {' '.join(f'{r:+}' for r in rolls)}"
+            for (country, category), rolls in results.items()
+        ]
+        embed = discord.Embed(
+            title="📈 Bulk Modification",
+            description=_clip("\n".join(summary) or "*No changes applied.*", 4000),
+            color=discord.Color.green() if not errors else discord.Color.orange()
+        )
+        if errors:
+            embed.add_field(name=f"⚠️ {len(errors)} row(s) skipped", value=_clip("\n".join(errors), 1000), inline=False)
+        await interaction.followup.send(embed=embed)
+
+        # One digest DM instead of one per change
+        digest = [
+            f"{country}'s {category} is now {_read(country, category)}"
+            for country, category in results
+        ]
+        if not digest:
+            return
+        log = "🕵️ GM Log:\n" + "\n".join(digest)
+        if len(log) < 1900:
+            await interaction.user.send(log)
+        else:
+            await interaction.user.send(file=discord.File(io.StringIO(log), filename="bulkmodify_log.txt"))
 
     # === /eco Command ===
     @app_commands.command(name="eco", description="GM: Modify a country's economy score.")
@@ -137,5 +275,16 @@ class CountryModifiers(commands.Cog):
         await self.modify_stat(interaction, country, "military_strength.value", amount, method.value)
 
 
+def _read(country, category):
+    value = country_store.get(country)
+    for key in category.split("."):
+        value = value.get(key) if isinstance(value, dict) else None
+    return value
+
+
+def _clip(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
 async def setup(bot):
     await bot.add_cog(CountryModifiers(bot))
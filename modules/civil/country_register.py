@@ -1,63 +1,102 @@
 import discord # type: ignore
 from discord import app_commands # type: ignore
 from discord.ext import commands # type: ignore
-import os
-import json
 import random
-
-DATA_PATH = "/data/countries.json"
-
-# Ensure the data file exists
-def load_countries():
-    if not os.path.exists(DATA_PATH):
-        with open(DATA_PATH, "w") as f:
-            json.dump({}, f)
-    with open(DATA_PATH, "r") as f:
-        return json.load(f)
-
-def save_countries(data):
-    with open(DATA_PATH, "w") as f:
-        json.dump(data, f, indent=4)
-
-# Tier value ranges
-ECONOMY_TIERS = {
-    "Collapsed": (1, 24),
-    "Subsistence": (25, 74),
-    "Scraping By": (75, 149),
-    "Growing": (150, 224),
-    "Developing": (225, 299),
-    "Established": (300, 374),
-    "Thriving": (375, 449),
-    "Commercialized": (450, 549),
-    "Prosperous": (550, 649),
-    "Powerhouse": (650, 774),
-    "Great Power": (775, 899),
-    "Juggernaut": (900, 999),
-    "Hegemon": (1000, 1499),
-    "World Engine": (1500, 1999),
-    "Economic Singularity": (2000, 3000),
+import io
+
+from modules.civil.country_store import country_store
+from modules.civil.tiers import (
+    ECONOMY_TIERS,
+    STABILITY_TIERS,
+    MILITARY_TIERS,
+    MORALE_TIERS,
+    SUPPLY_TIERS,
+)
+from storage import run_io
+from utils import normalize_name, parse_rows
+
+IMPORT_FIELDS = (
+    "name", "leader", "military_tier", "stability_tier", "economy_tier",
+    "morale", "supply", "composition", "tags",
+)
+# Import column -> (tier table, ledger field)
+IMPORT_TIERS = {
+    "military_tier": (MILITARY_TIERS, "military_strength"),
+    "stability_tier": (STABILITY_TIERS, "stability"),
+    "economy_tier": (ECONOMY_TIERS, "economy"),
+    "morale": (MORALE_TIERS, "morale"),
+    "supply": (SUPPLY_TIERS, "supply"),
 }
+MAX_IMPORT_BYTES = 10 * 2**20
+REJECTS_SHOWN = 15
+
+
+# === Country Import ===
+def _tier_lookup(tiers):
+    return {normalize_name(name): name for name in tiers}
+
+
+_TIER_NAMES = {column: _tier_lookup(tiers) for column, (tiers, _) in IMPORT_TIERS.items()}
+
+
+def prepare_import(data, existing, seed=None):
+    """Parse, validate and roll an uploaded CSV/JSONL file.
+
+    Runs in the IO pool: rows are streamed from the bytes, checked against
+    the tier tables and the names in ``existing`` (normalized), and the
+    stat values for every accepted row are rolled column by column at the
+    end. Returns ``([(name, record), ...], [reject line, ...])``.
+    """
+    accepted, rejects, seen = [], [], set(existing)
+    text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", errors="replace", newline="")
+    for line, row, error in parse_rows(text, IMPORT_FIELDS):
+        if error:
+            rejects.append(f"Row {line}: {error}")
+            continue
+        name = str(row["name"] or "").strip()
+        leader = str(row["leader"] or "").strip()
+        if not name or not leader:
+            rejects.append(f"Row {line}: name and leader are required")
+            continue
+        if normalize_name(name) in seen:
+            rejects.append(f"Row {line}: **{name}** is already recorded")
+            continue
+
+        tiers, problems = {}, []
+        for column, lookup in _TIER_NAMES.items():
+            tier = lookup.get(normalize_name(str(row[column] or "").strip()))
+            if tier is None:
+                problems.append(f"{column} `{row[column]}`")
+            tiers[column] = tier
+        if problems:
+            rejects.append(f"Row {line}: unknown " + ", ".join(problems))
+            continue
+
+        tags = row["tags"] or []
+        if isinstance(tags, str):
+            tags = tags.replace(";", ",").split(",")
+        seen.add(normalize_name(name))
+        accepted.append((name, leader, tiers, str(row["composition"] or ""), [str(t).strip() for t in tags if str(t).strip()]))
+
+    # Roll every stat as one column across all accepted rows
+    rng = random.Random(seed)
+    rolled = {
+        column: [rng.randint(*IMPORT_TIERS[column][0][tiers[column]]) for _, _, tiers, _, _ in accepted]
+        for column in IMPORT_TIERS
+    }
+
+    records = []
+    for i, (name, leader, tiers, composition, tags) in enumerate(accepted):
+        record = {"leader": leader}
+        for column, (_, field) in IMPORT_TIERS.items():
+            value = rolled[column][i]
+            record[field] = value if field in ("morale", "supply") else {"tier": tiers[column], "value": value}
+        record["composition"] = composition
+        record["tags"] = tags
+        records.append((name, record))
+    return records, rejects
 
-STABILITY_TIERS = {
-    "Anarchy": (0, 9),
-    "Uprising": (10, 19),
-    "Chaotic": (20, 34),
-    "Unstable": (35, 49),
-    "Shaky": (50, 59),
-    "Stable": (60, 69),
-    "Cohesive": (70, 79),
-    "Harmonized": (80, 89),
-    "Unified": (90, 97),
-    "Iron Order": (98, 100),
-}
 
-MILITARY_TIERS = {
-    "Trivial": (1, 9),
-    "Light": (10, 24),
-    "Moderate": (25, 49),
-    "Heavy": (50, 74),
-    "Overwhelming": (75, 100),
-}
 
 class CountryRegister(commands.Cog):
     def __init__(self, bot):
@@ -79,18 +118,8 @@ class CountryRegister(commands.Cog):
         military_tier=[app_commands.Choice(name=k, value=k) for k in MILITARY_TIERS],
         stability_tier=[app_commands.Choice(name=k, value=k) for k in STABILITY_TIERS],
         economy_tier=[app_commands.Choice(name=k, value=k) for k in ECONOMY_TIERS],
-        morale=[
-            app_commands.Choice(name="Low", value="Low"),
-            app_commands.Choice(name="Normal", value="Normal"),
-            app_commands.Choice(name="High", value="High"),
-            app_commands.Choice(name="Unbreakable", value="Unbreakable"),
-        ],
-        supply=[
-            app_commands.Choice(name="Starving", value="Starving"),
-            app_commands.Choice(name="Low", value="Low"),
-            app_commands.Choice(name="Adequate", value="Adequate"),
-            app_commands.Choice(name="Abundant", value="Abundant"),
-        ]
+        morale=[app_commands.Choice(name=k, value=k) for k in MORALE_TIERS],
+        supply=[app_commands.Choice(name=k, value=k) for k in SUPPLY_TIERS],
     )
     async def register_country(
         self,
@@ -105,9 +134,7 @@ class CountryRegister(commands.Cog):
         composition: str = "",
         tags: str = ""
     ):
-        countries = load_countries()
-
-        if name in countries:
+        if name in country_store:
             await interaction.response.send_message(
                 f"⚠️ The Archivist has already recorded **{name}**.", ephemeral=True)
             return
@@ -116,10 +143,12 @@ class CountryRegister(commands.Cog):
         econ_val = random.randint(*ECONOMY_TIERS[economy_tier.value])
         stab_val = random.randint(*STABILITY_TIERS[stability_tier.value])
         mil_val = random.randint(*MILITARY_TIERS[military_tier.value])
+        morale_val = random.randint(*MORALE_TIERS[morale.value])
+        supply_val = random.randint(*SUPPLY_TIERS[supply.value])
 
         tag_list = [t.strip() for t in tags.split(",") if t.strip()]
 
-        countries[name] = {
+        country_store.set([name], {
             "leader": leader,
             "military_strength": {
                 "tier": military_tier.value,
@@ -133,13 +162,11 @@ class CountryRegister(commands.Cog):
                 "tier": economy_tier.value,
                 "value": econ_val
             },
-            "morale": morale.value,
-            "supply": supply.value,
+            "morale": morale_val,
+            "supply": supply_val,
             "composition": composition,
             "tags": tag_list
-        }
-
-        save_countries(countries)
+        })
 
         embed = discord.Embed(
             title=f"📜 The Archivist Records {name}",
@@ -162,6 +189,47 @@ class CountryRegister(commands.Cog):
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
 
+    @app_commands.command(name="importcountries", description="GM: Register many countries from a CSV or JSONL file.")
+    @app_commands.describe(file="CSV (with a header row) or JSON lines with: " + ", ".join(IMPORT_FIELDS))
+    async def import_countries(self, interaction: discord.Interaction, file: discord.Attachment):
+        if not any(role.name == "GM (Game Managers)" for role in interaction.user.roles):
+            await interaction.response.send_message("❌ Only GMs may import countries.", ephemeral=True)
+            return
+        if file.size > MAX_IMPORT_BYTES:
+            await interaction.response.send_message("❌ That file is too large to import.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        data = await file.read()
+        existing = {normalize_name(name) for name in country_store.names()}
+        records, rejects = await run_io(prepare_import, data, existing)
+
+        # One uninterrupted run of writes: a single write-behind flush
+        added = 0
+        for name, record in records:
+            if name in country_store:
+                rejects.append(f"**{name}** was registered during the import")
+                continue
+            country_store.set([name], record)
+            added += 1
+
+        embed = discord.Embed(
+            title=f"📜 The Archivist Records {added} Nation(s)",
+            description=f"*{len(rejects)} row(s) rejected.*" if rejects else "*Every row was accepted.*",
+            color=discord.Color.gold() if not rejects else discord.Color.orange()
+        )
+        if rejects:
+            shown = "\n".join(rejects[:REJECTS_SHOWN])
+            if len(rejects) > REJECTS_SHOWN:
+                shown += f"\n…and {len(rejects) - REJECTS_SHOWN} more (see attached file)."
+            embed.add_field(name="⚠️ Rejected", value=shown[:1024], inline=False)
+
+        if len(rejects) > REJECTS_SHOWN:
+            report = discord.File(io.StringIO("\n".join(rejects)), filename="import_rejects.txt")
+            await interaction.followup.send(embed=embed, file=report, ephemeral=True)
+        else:
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
 
 async def setup(bot):
     await bot.add_cog(CountryRegister(bot))
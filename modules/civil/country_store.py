@@ -0,0 +1,152 @@
+import discord  # type: ignore
+from discord import app_commands  # type: ignore
+
+from storage import JsonStore, EntityTable
+from search_index import SearchIndex
+from modules.civil.tiers import TIERS, classify_world
+
+DATA_PATH = "/data/countries.json"
+
+
+# === Process-wide Country Store ===
+class CountryStore(JsonStore):
+    """Keeps the country ledger in memory so commands never re-parse the file.
+
+    The file is read once (at startup, or on first use) and every cog reads
+    and mutates the same dict. ``save()`` schedules a write-behind flush.
+    """
+
+    def __init__(self, path):
+        super().__init__(path, default=dict, indent=4, layout=EntityTable("countries"))
+
+    def get(self, name):
+        return self.all().get(name)
+
+    def names(self):
+        return self.all().keys()
+
+    def __contains__(self, name):
+        return name in self.all()
+
+
+country_store = CountryStore(DATA_PATH)
+
+
+# === Name Search Index ===
+country_index = SearchIndex()
+
+
+def _index_country_change(op):
+    if op is None:
+        country_index.rebuild(country_store.names())
+    elif len(op["path"]) == 1:
+        # Top-level set/del is a registration, reset or removal
+        name = op["path"][0]
+        if op["op"] == "del":
+            country_index.remove(name)
+        else:
+            country_index.add(name)
+
+
+country_store.subscribe(_index_country_change)
+
+
+# === Entity Versions ===
+_versions = {}  # country -> writes seen since the last full load
+_epoch = 0      # bumped when the whole ledger is loaded or replaced
+
+
+def country_version(name):
+    """A version for ``name`` that grows with every write to that country."""
+    return _epoch, _versions.get(name, 0)
+
+
+def _bump_version(op):
+    global _epoch
+    if op is None:
+        _epoch += 1
+        _versions.clear()
+    elif op["path"]:
+        name = op["path"][0]
+        _versions[name] = _versions.get(name, 0) + 1
+
+
+country_store.subscribe(_bump_version)
+
+
+# === Derived Tiers ===
+TIERED_STATS = ("economy", "stability", "military_strength")
+_crossing_listeners = []
+
+
+def on_tier_crossing(callback):
+    """Call ``callback(country, stat, old_tier, new_tier)`` whenever a value
+    change moves a stat into another tier."""
+    _crossing_listeners.append(callback)
+
+
+def emit_tier_crossing(country, stat, old_tier, new_tier):
+    for callback in _crossing_listeners:
+        callback(country, stat, old_tier, new_tier)
+
+
+def _set_tier(country, stat, tier):
+    old = country_store.get(country)[stat].get("tier")
+    if old == tier:
+        return None
+    country_store.set([country, stat, "tier"], tier)
+    return old
+
+
+def _materialize_tiers(op):
+    """Keep each stored ``tier`` in step with its ``value``.
+
+    A value write reclassifies only that stat; a whole-country write checks
+    that country's stats; a load or replace reconciles the whole ledger once.
+    """
+    if op is None:
+        for country, tiers in classify_world(country_store.all(), TIERED_STATS).items():
+            for stat, tier in tiers.items():
+                _set_tier(country, stat, tier)
+        return
+    if op["op"] == "del":
+        return
+
+    path = op["path"]
+    if len(path) == 3 and path[1] in TIERED_STATS and path[2] == "value":
+        country, stat = path[0], path[1]
+        if not isinstance(op["value"], (int, float)):
+            return
+        new = TIERS[stat].classify(op["value"])
+        old = _set_tier(country, stat, new)
+        if old is not None:
+            emit_tier_crossing(country, stat, old, new)
+    elif len(path) == 1 and isinstance(op["value"], dict):
+        country = path[0]
+        for stat, tier in classify_world({country: op["value"]}, TIERED_STATS)[country].items():
+            _set_tier(country, stat, tier)
+
+
+country_store.subscribe(_materialize_tiers)
+
+
+# === Fuzzy Name Resolution ===
+def resolve_country(name):
+    """The registered name ``name`` clearly refers to (typos allowed), or None."""
+    country_store.all()  # make sure the ledger (and so the index) is loaded
+    return country_index.resolve(name)
+
+
+def suggest_countries(name):
+    """Closest registered names, for "did you mean" replies."""
+    country_store.all()
+    return country_index.closest(name)
+
+
+# === Country Name Autocomplete (for slash commands) ===
+async def autocomplete_country_names(interaction: discord.Interaction, current: str):
+    country_store.all()  # make sure the ledger (and so the index) is loaded
+    return [
+        app_commands.Choice(name=name, value=name)
+        for name in country_index.search(current)
+    ]
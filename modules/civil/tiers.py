@@ -0,0 +1,146 @@
+from bisect import bisect_right
+from collections import namedtuple
+
+# === Tier Tables (the single source for every cog) ===
+ECONOMY_TIERS = {
+    "Collapsed": (1, 24),
+    "Subsistence": (25, 74),
+    "Scraping By": (75, 149),
+    "Growing": (150, 224),
+    "Developing": (225, 299),
+    "Established": (300, 374),
+    "Thriving": (375, 449),
+    "Commercialized": (450, 549),
+    "Prosperous": (550, 649),
+    "Powerhouse": (650, 774),
+    "Great Power": (775, 899),
+    "Juggernaut": (900, 999),
+    "Hegemon": (1000, 1499),
+    "World Engine": (1500, 1999),
+    "Economic Singularity": (2000, 3000),
+}
+
+STABILITY_TIERS = {
+    "Anarchy": (0, 9),
+    "Uprising": (10, 19),
+    "Chaotic": (20, 34),
+    "Unstable": (35, 49),
+    "Shaky": (50, 59),
+    "Stable": (60, 69),
+    "Cohesive": (70, 79),
+    "Harmonized": (80, 89),
+    "Unified": (90, 97),
+    "Iron Order": (98, 100),
+}
+
+MILITARY_TIERS = {
+    "Trivial": (1, 9),
+    "Light": (10, 24),
+    "Moderate": (25, 49),
+    "Heavy": (50, 74),
+    "Overwhelming": (75, 100),
+}
+
+MORALE_TIERS = {
+    "Low": (1, 33),
+    "Normal": (34, 66),
+    "High": (67, 89),
+    "Unbreakable": (90, 100),
+}
+
+SUPPLY_TIERS = {
+    "Starving": (1, 24),
+    "Low": (25, 49),
+    "Adequate": (50, 74),
+    "Abundant": (75, 100),
+}
+
+TierShift = namedtuple("TierShift", ["tier", "direction", "points"])
+
+
+class TierTable:
+    """Sorted boundary arrays for one stat's tiers.
+
+    ``classify`` is a single ``bisect`` over the lower bounds; values below
+    the first tier or above the last are clamped to those tiers.
+    """
+
+    def __init__(self, tiers):
+        ordered = sorted(tiers.items(), key=lambda item: item[1][0])
+        self.names = [name for name, _ in ordered]
+        self.lows = [low for _, (low, _) in ordered]
+        self.highs = [high for _, (_, high) in ordered]
+        self._position = {name: i for i, name in enumerate(self.names)}
+
+    def __contains__(self, tier):
+        return tier in self._position
+
+    def bounds(self, tier):
+        i = self._position[tier]
+        return self.lows[i], self.highs[i]
+
+    def _index(self, value):
+        return min(max(bisect_right(self.lows, value) - 1, 0), len(self.names) - 1)
+
+    def classify(self, value):
+        return self.names[self._index(value)]
+
+    def classify_many(self, values):
+        """Classify a whole column of values in one pass."""
+        lows, names, last = self.lows, self.names, len(self.names) - 1
+        return [names[min(max(bisect_right(lows, v) - 1, 0), last)] for v in values]
+
+    def shift(self, value):
+        """The nearest neighbouring tier and the points needed to reach it.
+
+        Returns None when there is nowhere to go (a table of one tier).
+        Ties favour improvement.
+        """
+        i = self._index(value)
+        up = down = None
+        if i + 1 < len(self.names):
+            up = TierShift(self.names[i + 1], "improvement", self.lows[i + 1] - value)
+        if i > 0:
+            down = TierShift(self.names[i - 1], "degradation", value - self.highs[i - 1])
+        if up and down:
+            return up if up.points <= down.points else down
+        return up or down
+
+
+TIERS = {
+    "economy": TierTable(ECONOMY_TIERS),
+    "stability": TierTable(STABILITY_TIERS),
+    "military_strength": TierTable(MILITARY_TIERS),
+    "morale": TierTable(MORALE_TIERS),
+    "supply": TierTable(SUPPLY_TIERS),
+}
+
+
+def describe(stat, raw):
+    """(tier, value, shift) for a stored stat.
+
+    ``raw`` is either a number or, for ledgers written before morale and
+    supply were numeric, a tier name; a name has no value or shift.
+    """
+    table = TIERS[stat]
+    if isinstance(raw, str):
+        return raw, None, None
+    return table.classify(raw), raw, table.shift(raw)
+
+
+def classify_world(countries, stats=("economy", "stability", "military_strength")):
+    """Tier every country's stats in one pass per stat.
+
+    Returns ``{country: {stat: tier}}`` for the numeric values found.
+    """
+    result = {name: {} for name in countries}
+    for stat in stats:
+        rows = [
+            (name, data[stat]["value"])
+            for name, data in countries.items()
+            if isinstance(data.get(stat), dict) and isinstance(data[stat].get("value"), (int, float))
+        ]
+        tiers = TIERS[stat].classify_many(value for _, value in rows)
+        for (name, _), tier in zip(rows, tiers):
+            result[name][stat] = tier
+    return result
@@ -0,0 +1,238 @@
+import time
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from itertools import repeat
+
+try:
+    import numpy as np
+except ImportError:  # optional: the array fallback gives the same results, only slower
+    np = None
+
+from modules.civil.country_store import country_store, emit_tier_crossing, TIERED_STATS
+from modules.civil.tiers import TIERS
+from modules.war.war_registry import war_registry
+
+# Ledger field holding each column's value
+STAT_PATHS = {
+    "economy": ("economy", "value"),
+    "stability": ("stability", "value"),
+    "military_strength": ("military_strength", "value"),
+    "morale": ("morale",),
+    "supply": ("supply",),
+}
+
+# === Turn Rules ===
+SUPPLY_DRAIN_PER_INTENSITY = 2
+ECONOMY_GROWTH = {  # flat points per turn, by economy tier
+    "Collapsed": 1,
+    "Subsistence": 2,
+    "Scraping By": 3,
+    "Growing": 4,
+    "Developing": 5,
+    "Established": 6,
+    "Thriving": 7,
+    "Commercialized": 8,
+    "Prosperous": 9,
+    "Powerhouse": 10,
+    "Great Power": 12,
+    "Juggernaut": 14,
+    "Hegemon": 20,
+    "World Engine": 25,
+    "Economic Singularity": 30,
+}
+MORALE_BASELINE = 50
+MORALE_DRIFT = 2
+STABILITY_DECAY = 1
+STABILITY_WAR_DECAY = 1
+
+
+# === Array Backend ===
+class _ArrayOps:
+    """The few NumPy functions the stages use, over ``array('q')``.
+
+    Scalars broadcast like they do in NumPy.
+    """
+
+    @staticmethod
+    def asarray(values):
+        return array("q", values)
+
+    @staticmethod
+    def zeros(n):
+        return array("q", bytes(8 * n))
+
+    @staticmethod
+    def _map(func, *args):
+        n = next(len(a) for a in args if not isinstance(a, (int, float)))
+        columns = [repeat(a, n) if isinstance(a, (int, float)) else a for a in args]
+        return array("q", map(func, *columns))
+
+    @classmethod
+    def add(cls, a, b):
+        return cls._map(int.__add__, a, b)
+
+    @classmethod
+    def subtract(cls, a, b):
+        return cls._map(int.__sub__, a, b)
+
+    @classmethod
+    def multiply(cls, a, b):
+        return cls._map(int.__mul__, a, b)
+
+    @classmethod
+    def minimum(cls, a, b):
+        return cls._map(min, a, b)
+
+    @classmethod
+    def abs(cls, a):
+        return cls._map(abs, a)
+
+    @classmethod
+    def sign(cls, a):
+        return cls._map(lambda x: (x > 0) - (x < 0), a)
+
+    @classmethod
+    def clip(cls, a, low, high):
+        return cls._map(lambda x: low if x < low else high if x > high else x, a)
+
+    @staticmethod
+    def take(table, indices):
+        return array("q", (table[i] for i in indices))
+
+    @staticmethod
+    def searchsorted(bounds, values, side="right"):
+        return array("q", (bisect_right(bounds, v) for v in values))
+
+
+xp = np if np is not None else _ArrayOps
+
+
+def tier_indices(stat, values):
+    """Tier position of every value, in one vectorized lookup."""
+    table = TIERS[stat]
+    found = xp.searchsorted(xp.asarray(table.lows), values, side="right")
+    return xp.clip(xp.subtract(found, 1), 0, len(table.names) - 1)
+
+
+# === Pluggable Stages ===
+TURN_STAGES = []
+
+
+def turn_stage(func):
+    """Register ``func(columns)`` to run, in registration order, every turn.
+
+    ``columns`` maps each stat (plus ``war_pressure``) to an int array with
+    one slot per country; a stage replaces the arrays it changes.
+    """
+    TURN_STAGES.append(func)
+    return func
+
+
+@turn_stage
+def supply_drain(columns):
+    drain = xp.multiply(columns["war_pressure"], SUPPLY_DRAIN_PER_INTENSITY)
+    columns["supply"] = xp.subtract(columns["supply"], drain)
+
+
+@turn_stage
+def economy_growth(columns):
+    growth = xp.asarray([ECONOMY_GROWTH[name] for name in TIERS["economy"].names])
+    tiers = tier_indices("economy", columns["economy"])
+    columns["economy"] = xp.add(columns["economy"], xp.take(growth, tiers))
+
+
+@turn_stage
+def morale_drift(columns):
+    gap = xp.subtract(MORALE_BASELINE, columns["morale"])
+    step = xp.multiply(xp.sign(gap), xp.minimum(xp.abs(gap), MORALE_DRIFT))
+    columns["morale"] = xp.add(columns["morale"], step)
+
+
+@turn_stage
+def stability_decay(columns):
+    at_war = xp.minimum(columns["war_pressure"], 1)
+    decay = xp.add(xp.multiply(at_war, STABILITY_WAR_DECAY), STABILITY_DECAY)
+    columns["stability"] = xp.subtract(columns["stability"], decay)
+
+
+# === Pipeline ===
+TurnReport = namedtuple("TurnReport", ["countries", "changed", "crossings", "elapsed_ms"])
+
+
+def _read_columns(countries):
+    """One walk over the ledger into column arrays, plus which slots hold numbers."""
+    names = list(countries)
+    values = {stat: [] for stat in STAT_PATHS}
+    present = {stat: [] for stat in STAT_PATHS}
+    for name in names:
+        data = countries[name]
+        for stat, path in STAT_PATHS.items():
+            value = data
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            values[stat].append(int(value) if numeric else 0)
+            present[stat].append(numeric)
+
+    pressure = dict.fromkeys(names, 0)
+    for war in war_registry.active():
+        for side in ("attacker", "defender"):
+            if war.get(side) in pressure:
+                pressure[war[side]] += war.get("intensity") or 1
+
+    columns = {stat: xp.asarray(column) for stat, column in values.items()}
+    columns["war_pressure"] = xp.asarray([pressure[name] for name in names])
+    return names, columns, present
+
+
+def run_turn(stages=None):
+    """Apply every turn stage to the whole world and commit the result.
+
+    All writes happen back to back with no await in between, so the turn
+    lands as one write-behind flush. Tiers are reclassified in bulk and
+    written before their values, so the per-write tier listener has
+    nothing left to do; crossings are emitted from here instead.
+    """
+    started = time.perf_counter()
+    countries = country_store.all()
+    names, columns, present = _read_columns(countries)
+    if not names:
+        return TurnReport(0, 0, [], 0.0)
+
+    before = {stat: list(columns[stat]) for stat in STAT_PATHS}
+    for stage in TURN_STAGES if stages is None else stages:
+        stage(columns)
+
+    tiers = {
+        stat: [TIERS[stat].names[i] for i in list(tier_indices(stat, columns[stat]))]
+        for stat in TIERED_STATS
+    }
+
+    changed, crossings = set(), []
+    for stat, path in STAT_PATHS.items():
+        floor = TIERS[stat].lows[0]
+        after = list(columns[stat])
+        for i, name in enumerate(names):
+            if not present[stat][i] or after[i] == before[stat][i]:
+                continue
+            # A stage may not push a stat below its table; values a GM set
+            # outside the table are left alone
+            after[i] = max(after[i], min(floor, before[stat][i]))
+            if after[i] == before[stat][i]:
+                continue
+            if stat in tiers:
+                old_tier = countries[name][stat].get("tier")
+                new_tier = tiers[stat][i]
+                if old_tier != new_tier:
+                    country_store.set([name, stat, "tier"], new_tier)
+                    if old_tier is not None:
+                        crossings.append((name, stat, old_tier, new_tier))
+            country_store.set([name, *path], int(after[i]))
+            changed.add(name)
+
+    for crossing in crossings:
+        emit_tier_crossing(*crossing)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return TurnReport(len(names), len(changed), crossings, elapsed_ms)
@@ -0,0 +1,18 @@
+from storage import JsonStore, DocumentRow
+
+TRACKER_PATH = "/data/turn_tracker.json"
+
+# Kept out of the year_tracker extension so reloading it never opens a
+# second store on the same file
+tracker_store = JsonStore(
+    TRACKER_PATH,
+    default=lambda: {"year": 1444, "turn": 1},
+    indent=4,
+    layout=DocumentRow("turn_state"),
+)
+
+def load_tracker():
+    return tracker_store.all()
+
+def save_tracker(data):
+    tracker_store.replace(data)
@@ -1,28 +1,25 @@
 import discord
 from discord.ext import commands
 from discord import app_commands, Interaction
-import os
-import json
 
-TRACKER_PATH = "/data/turn_tracker.json"
-
-def load_tracker():
-    if not os.path.exists(TRACKER_PATH):
-        return {"year": 1444, "turn": 1}
-    with open(TRACKER_PATH, "r") as f:
-        return json.load(f)
-
-def save_tracker(data):
-    with open(TRACKER_PATH, "w") as f:
-        json.dump(data, f, indent=4)
+from storage import flush_all
+from modules.civil.turn_pipeline import run_turn
+from modules.civil.turn_state import load_tracker, save_tracker
 
 
 class YearTracker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @app_commands.command(name="startturn", description="Advance to the next turn (increments turn/year).")
+    @app_commands.command(name="startturn", description="GM: Advance to the next turn and run the world update.")
     async def start_turn(self, interaction: Interaction):
+        if not any(role.name == "GM (Game Managers)" for role in interaction.user.roles):
+            await interaction.response.send_message("❌ Only GMs may advance the turn.", ephemeral=True)
+            return
+
+        # Supply drain, growth, morale drift and decay for every country at once
+        report = run_turn()
+
         tracker = load_tracker()
         tracker["turn"] += 1
         if tracker["turn"] > 4:
@@ -30,10 +27,17 @@ class YearTracker(commands.Cog):
             tracker["year"] += 1
         save_tracker(tracker)
 
-        await interaction.response.send_message(
-            f"📅 It is now Turn {tracker['turn']} of the year {tracker['year']}.",
-            ephemeral=False
-        )
+        message = f"📅 It is now Turn {tracker['turn']} of the year {tracker['year']}."
+        if report.countries:
+            message += (
+                f"\n🌍 The world turns: {report.changed} of {report.countries} nations changed"
+                f", {len(report.crossings)} tier shift(s)."
+            )
+        await interaction.response.send_message(message, ephemeral=False)
+
+        # A new turn is a checkpoint: persist every pending change now. This
+        # rewrites every snapshot, so it runs after the reply is sent
+        await flush_all()
 
     @app_commands.command(name="checkturn", description="Check the current turn and year.")
     async def check_turn(self, interaction: Interaction):
@@ -1,33 +1,102 @@
 import discord
 from discord.ext import commands
-import os
+import gzip
 import json
 import io
+import tempfile
 
-DATA_PATH = "/data/countries.json"
+from modules.civil.country_store import country_store, resolve_country, suggest_countries
+from modules.civil.tiers import TIERS
+from modules.civil.turn_state import tracker_store
+from modules.war.war_utils import war_store
+from storage import run_io
+from utils import did_you_mean
 
-def load_countries():
-    with open(DATA_PATH, "r") as f:
-        return json.load(f)
+EXPORT_FORMATS = ("json", "jsonl")
+EXPORT_BATCH = 200  # records per compression hand-off
+UPLOAD_LIMIT = 8 * 2**20  # outside a guild (DMs); guilds report their own limit
+
+
+# === Streaming Export ===
+def capture_export():
+    """Encode every record now, in one pass with no await, so the export
+    is a single point in time even if a turn or a batch lands while it is
+    being compressed. Costs one JSON encode of the world, like a snapshot.
+    """
+    countries = [(json.dumps(name), json.dumps(data)) for name, data in country_store.all().items()]
+    wars = [json.dumps(war) for war in war_store.all()["wars"]]
+    return countries, wars, json.dumps(tracker_store.all())
+
+
+def _export_parts(fmt, capture):
+    """The captured export as a stream of text pieces, about one record each."""
+    countries, wars, turn = capture
+
+    if fmt == "jsonl":
+        for name, data in countries:
+            yield f'{{"type": "country", "name": {name}, "data": {data}}}\n'
+        for war in wars:
+            yield f'{{"type": "war", "data": {war}}}\n'
+        yield f'{{"type": "turn", "data": {turn}}}\n'
+        return
+
+    yield '{\n"countries": {'
+    separator = "\n"
+    for name, data in countries:
+        yield f"{separator}{name}: {data}"
+        separator = ",\n"
+    yield '\n},\n"wars": ['
+    separator = "\n"
+    for war in wars:
+        yield f"{separator}{war}"
+        separator = ",\n"
+    yield f'\n],\n"turn": {turn}\n}}\n'
+
+
+async def stream_export(buffer, fmt, filename):
+    """Write a gzip export into ``buffer``; returns its compressed size.
+
+    The records are captured up front (see ``capture_export``) and
+    compressed in the IO pool in batches.
+    """
+    gz = gzip.GzipFile(filename=filename.removesuffix(".gz"), mode="wb", fileobj=buffer)
+    batch = []
+    for part in _export_parts(fmt, capture_export()):
+        batch.append(part)
+        if len(batch) >= EXPORT_BATCH:
+            await run_io(gz.write, "".join(batch).encode())
+            batch = []
+    if batch:
+        await run_io(gz.write, "".join(batch).encode())
+    await run_io(gz.close)
+    return buffer.tell()
 
-def save_countries(data):
-    with open(DATA_PATH, "w") as f:
-        json.dump(data, f, indent=4)
 
 class DebugCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    # !dumpjson — Dump all countries JSON as a file
+    # !dumpjson [json|jsonl] — Export countries, wars and turn state as a gzip file
     @commands.command(name="!dumpjson")
-    async def dump_json(self, ctx):
+    async def dump_json(self, ctx, fmt: str = "json"):
         if not any(role.name == "GM (Game Managers)" for role in ctx.author.roles):
             await ctx.send("❌ You do not have permission to run debug commands.")
             return
 
-        countries = load_countries()
-        json_text = json.dumps(countries, indent=2)
-        await ctx.send(file=discord.File(io.StringIO(json_text), filename="countries_debug.json"))
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            await ctx.send("❌ Format must be `json` or `jsonl`.")
+            return
+
+        filename = f"archivist_dump.{fmt}.gz"
+        with tempfile.TemporaryFile() as buffer:
+            size = await stream_export(buffer, fmt, filename)
+            limit = ctx.guild.filesize_limit if ctx.guild is not None else UPLOAD_LIMIT
+            if size > limit:
+                await ctx.send(f"❌ The export is {size / 2**20:.1f} MiB compressed, over Discord's upload limit.")
+                return
+            buffer.seek(0)
+            await ctx.send(file=discord.File(buffer, filename=filename))
 
     # !dumpcountry <Country Name> — View specific country JSON
     @commands.command(name="!dumpcountry")
@@ -36,9 +105,10 @@ class DebugCommands(commands.Cog):
             await ctx.send("❌ You do not have permission to run debug commands.")
             return
 
-        countries = load_countries()
+        country = resolve_country(country) or country
+        countries = country_store.all()
         if country not in countries:
-            await ctx.send(f"❌ Country `{country}` not found.")
+            await ctx.send(f"❌ Country `{country}` not found.{did_you_mean(suggest_countries(country))}")
             return
 
         data = json.dumps(countries[country], indent=2)
@@ -50,7 +120,7 @@ class DebugCommands(commands.Cog):
     # !listcountries — List all country names
     @commands.command(name="!listcountries")
     async def list_countries(self, ctx):
-        countries = load_countries()
+        countries = country_store.all()
         names = ", ".join(countries.keys())
         await ctx.send(f"🌍 **Registered Countries** ({len(countries)}):\n{names}")
 
@@ -61,22 +131,21 @@ class DebugCommands(commands.Cog):
             await ctx.send("❌ You do not have permission to run debug commands.")
             return
 
-        countries = load_countries()
+        countries = country_store.all()
         if country not in countries:
-            await ctx.send(f"❌ Country `{country}` not found.")
+            await ctx.send(f"❌ Country `{country}` not found.{did_you_mean(suggest_countries(country))}")
             return
 
-        countries[country] = {
+        country_store.set([country], {
             "leader": "Unknown",
-            "military_strength": {"tier": "Trivial"},
-            "economy": {"tier": "Collapsed", "value": 0},
-            "stability": {"tier": "Revolution", "value": 0},
+            "military_strength": {"tier": TIERS["military_strength"].classify(0), "value": 0},
+            "economy": {"tier": TIERS["economy"].classify(0), "value": 0},
+            "stability": {"tier": TIERS["stability"].classify(0), "value": 0},
             "morale": 50,
             "supply": 50,
             "composition": "Unknown",
             "tags": []
-        }
-        save_countries(countries)
+        })
         await ctx.send(f"🔁 `{country}` has been reset to defaults.")
 
 async def setup(bot):
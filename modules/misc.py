@@ -1,3 +1,67 @@
-def setup(bot):
-    # Register all command objects for misc here (if any)
-    pass
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from dice import MAX_SAMPLE_DICE, compile_dice, run_dice, stats
+
+STAT_SAMPLES = 200_000
+
+
+def expression_odds(expr, target=None):
+    """(mean, SD, source, chance of at least ``target``): exact when the
+    expression is small enough, otherwise estimated from samples."""
+    try:
+        distribution = expr.distribution()
+        mean, spread = stats(distribution)
+        at_least = sum(p for total, p in distribution.items() if target is not None and total >= target)
+        return mean, spread, "exact", at_least
+    except ValueError:
+        # Too large to enumerate: estimate from a batch of samples instead
+        n = max(1, min(STAT_SAMPLES, MAX_SAMPLE_DICE // max(1, expr.dice_count)))
+        samples = list(expr.sample(n))
+        mean = sum(samples) / n
+        spread = (sum((s - mean) ** 2 for s in samples) / n) ** 0.5
+        at_least = sum(1 for s in samples if target is not None and s >= target) / n
+        return mean, spread, f"from {n:,} samples", at_least
+
+
+# === /roll Command ===
+
+
+@app_commands.describe(
+    expression="Dice to roll, e.g. 3d6+2, 2d10kh1 (advantage), 4d6dl1",
+    target="(Optional) Show the chance of rolling at least this total",
+)
+async def roll(interaction: discord.Interaction, expression: str, target: int = None):
+    try:
+        expr = compile_dice(expression)
+    except ValueError as e:
+        await interaction.response.send_message(f"❌ {e}.", ephemeral=True)
+        return
+
+    # Large expressions can take a while to work out
+    await interaction.response.defer()
+    result = expr.roll()
+    dice = " ".join(f"{term}: [{', '.join(map(str, rolls))}]" for term, rolls in result.dice)
+    message = f"🎲 **{expr.text}** → **{result.total}**"
+    if dice:
+        message += "\n" + (dice if len(dice) <= 1500 else dice[:1499] + "…")
+
+    mean, spread, source, at_least = await run_dice(expression_odds, expr, target)
+    message += (
+        f"\n📊 Range {expr.minimum}–{expr.maximum} | Mean {mean:.2f} | SD {spread:.2f} ({source})"
+    )
+    if target is not None:
+        message += f"\n🎯 Chance of {target} or more: **{at_least:.1%}**"
+    await interaction.followup.send(message)
+
+
+roll_cmd = app_commands.Command(
+    name="roll",
+    description="Roll a dice expression and see its odds.",
+    callback=roll,
+)
+
+
+async def setup(bot: commands.Bot):
+    bot.tree.add_command(roll_cmd)
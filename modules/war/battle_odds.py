@@ -0,0 +1,216 @@
+import asyncio
+import multiprocessing
+import os
+import random
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # optional: Monte Carlo falls back to random.choices
+    np = None
+
+from dice import compile_dice
+from utils import MOMENTUM_SHIFTS
+
+ROLL_MODES = ("None", "Advantage", "Disadvantage")
+BANDS = range(1, 11)
+# Past +-9 the clamp to 1..10 makes every modifier behave like +-9
+MAX_MODIFIER = 9
+MAX_SAMPLES = 2_000_000
+# Battles x samples per chain simulation; keeps the pure-Python path under a second
+MAX_CHAIN_DRAWS = 2_000_000
+
+# War forecasts: wars still undecided after this many battles count as unresolved
+MAX_WAR_TURNS = 500
+# Battle draws per forecast. An even war needs about 1.7 * intensity**2
+# battles to reach either end, so both the turn limit and the number of
+# simulated wars scale with intensity squared
+MAX_FORECAST_DRAWS = 4_000_000
+# Forecasts at least this large are split across worker processes
+PROCESS_THRESHOLD = 50_000
+FORECAST_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+# === Battle Rules ===
+BATTLE_DICE = {"None": "1d10", "Advantage": "2d10kh1", "Disadvantage": "2d10kl1"}
+
+
+def final_band(base_roll, modifier):
+    return max(1, min(10, base_roll + modifier))
+
+
+def roll_battle(modifier=0, roll_mode="None", rng=random):
+    """One /resolvebattle roll: (dice rolled, base_roll, final_roll)."""
+    base_roll, [(_, rolls)] = compile_dice(BATTLE_DICE.get(roll_mode, "1d10")).roll(rng)
+    return rolls, base_roll, final_band(base_roll, modifier)
+
+
+# === Exact Distribution ===
+def _band_counts(modifier, roll_mode):
+    counts = [0] * 10
+    for base_roll, p in compile_dice(BATTLE_DICE[roll_mode]).distribution().items():
+        counts[final_band(base_roll, modifier) - 1] += round(p * 100)
+    return tuple(counts)
+
+
+# Outcomes out of the 100 equally likely (d10, d10) pairs, for every
+# modifier and roll mode that behaves differently
+ODDS_TABLE = {
+    (modifier, roll_mode): _band_counts(modifier, roll_mode)
+    for modifier in range(-MAX_MODIFIER, MAX_MODIFIER + 1)
+    for roll_mode in ROLL_MODES
+}
+
+
+def band_odds(modifier=0, roll_mode="None"):
+    """Exact probability of each band 1..10, as a tuple of 10 floats."""
+    modifier = max(-MAX_MODIFIER, min(MAX_MODIFIER, modifier))
+    return tuple(count / 100 for count in ODDS_TABLE[(modifier, roll_mode)])
+
+
+def momentum_odds(modifier=0, roll_mode="None"):
+    """Exact probability of each momentum swing one battle can produce."""
+    modifier = max(-MAX_MODIFIER, min(MAX_MODIFIER, modifier))
+    counts = Counter()
+    for band, count in zip(BANDS, ODDS_TABLE[(modifier, roll_mode)]):
+        counts[MOMENTUM_SHIFTS[band]] += count
+    return {shift: counts[shift] / 100 for shift in sorted(counts)}
+
+
+# === Monte Carlo ===
+def simulate_chain(battles, samples=200_000, seed=None):
+    """Sample the net momentum of a chain of battles.
+
+    ``battles`` is a list of (modifier, roll_mode); each battle's band is
+    drawn from its exact distribution, a whole column of samples at a time.
+    ``samples`` is cut so the whole run draws at most ``MAX_CHAIN_DRAWS``.
+    Returns a Counter of net momentum -> number of samples.
+    """
+    samples = max(1, min(MAX_SAMPLES, samples, MAX_CHAIN_DRAWS // max(1, len(battles))))
+    shifts = [MOMENTUM_SHIFTS[band] for band in BANDS]
+
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        shift_table = np.array(shifts, dtype=np.int64)
+        total = np.zeros(samples, dtype=np.int64)
+        for modifier, roll_mode in battles:
+            total += shift_table[rng.choice(10, size=samples, p=band_odds(modifier, roll_mode))]
+        values, counts = np.unique(total, return_counts=True)
+        return Counter(dict(zip(values.tolist(), counts.tolist())))
+
+    rng = random.Random(seed)
+    total = [0] * samples
+    for modifier, roll_mode in battles:
+        modifier = max(-MAX_MODIFIER, min(MAX_MODIFIER, modifier))
+        cum_weights = list(accumulate(ODDS_TABLE[(modifier, roll_mode)]))
+        total = list(map(int.__add__, total, rng.choices(shifts, cum_weights=cum_weights, k=samples)))
+    return Counter(total)
+
+
+def summarize(outcomes):
+    """(P(attacker gains), P(even), P(defender gains), mean) from simulate_chain."""
+    samples = sum(outcomes.values())
+    gains = sum(n for net, n in outcomes.items() if net > 0) / samples
+    losses = sum(n for net, n in outcomes.items() if net < 0) / samples
+    mean = sum(net * n for net, n in outcomes.items()) / samples
+    return gains, 1 - gains - losses, losses, mean
+
+
+# === War Forecast ===
+Forecast = namedtuple("Forecast", ["attacker_wins", "defender_wins", "unresolved", "turns"])
+
+
+def simulate_wars(momentum, intensity, modifier, roll_mode, count, seed=None, max_turns=MAX_WAR_TURNS):
+    """Fight ``count`` copies of a war to the end, one battle per turn.
+
+    Each battle moves momentum by its band's swing; the attacker wins at
+    ``+intensity`` and the defender at ``-intensity``, the ends of the war
+    bar. Every live war advances together, one column of draws per turn.
+    Returns a Forecast of counts and the total turns of decided wars.
+    """
+    modifier = max(-MAX_MODIFIER, min(MAX_MODIFIER, modifier))
+    counts = ODDS_TABLE[(modifier, roll_mode)]
+    shifts = [MOMENTUM_SHIFTS[band] for band in BANDS]
+    attacker_wins = defender_wins = turns = 0
+    live = [momentum] * count
+
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        shift_table = np.array(shifts, dtype=np.int64)
+        p = [c / 100 for c in counts]
+        live = np.array(live, dtype=np.int64)
+        for turn in range(1, max_turns + 1):
+            if not live.size:
+                break
+            live = live + shift_table[rng.choice(10, size=live.size, p=p)]
+            won, lost = live >= intensity, live <= -intensity
+            attacker_wins += int(won.sum())
+            defender_wins += int(lost.sum())
+            turns += turn * int(won.sum() + lost.sum())
+            live = live[~(won | lost)]
+        return Forecast(attacker_wins, defender_wins, int(live.size), turns)
+
+    rng = random.Random(seed)
+    cum_weights = list(accumulate(counts))
+    for turn in range(1, max_turns + 1):
+        if not live:
+            break
+        live = list(map(int.__add__, live, rng.choices(shifts, cum_weights=cum_weights, k=len(live))))
+        still = []
+        for m in live:
+            if m >= intensity:
+                attacker_wins += 1
+                turns += turn
+            elif m <= -intensity:
+                defender_wins += 1
+                turns += turn
+            else:
+                still.append(m)
+        live = still
+    return Forecast(attacker_wins, defender_wins, len(live), turns)
+
+
+def forecast_limits(intensity, simulations):
+    """(simulations, turn limit) for a forecast within MAX_FORECAST_DRAWS."""
+    turns = max(MAX_WAR_TURNS, 10 * intensity ** 2)
+    return max(1, min(simulations, MAX_FORECAST_DRAWS // (2 * intensity ** 2))), turns
+
+
+_process_pool = None
+
+
+def _pool():
+    global _process_pool
+    if _process_pool is None:
+        # Never fork: this process already runs the storage and dice thread pools
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        _process_pool = ProcessPoolExecutor(max_workers=FORECAST_WORKERS, mp_context=context)
+    return _process_pool
+
+
+async def forecast_war(momentum, intensity, modifier=0, roll_mode="None", simulations=100_000):
+    """Simulate a war to resolution without blocking the event loop.
+
+    Large runs are split into one chunk per worker process, each with its
+    own seed, and the partial counts are summed. ``simulations`` is cut to
+    fit MAX_FORECAST_DRAWS; the counts in the result add up to the number
+    actually run.
+    """
+    simulations, max_turns = forecast_limits(max(1, intensity), simulations)
+    loop = asyncio.get_running_loop()
+    if simulations < PROCESS_THRESHOLD:
+        chunks = [simulations]
+    else:
+        size, extra = divmod(simulations, FORECAST_WORKERS)
+        chunks = [size + (i < extra) for i in range(FORECAST_WORKERS)]
+
+    seeds = [random.randrange(2**32) for _ in chunks]
+    executor = _pool() if len(chunks) > 1 else None
+    parts = await asyncio.gather(*(
+        loop.run_in_executor(executor, simulate_wars, momentum, intensity, modifier, roll_mode, n, seed, max_turns)
+        for n, seed in zip(chunks, seeds)
+    ))
+    return Forecast(*map(sum, zip(*parts)))
@@ -2,12 +2,21 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 
-from modules.war.war_utils import load_wars, save_wars
+from modules.war.war_registry import war_registry
+from modules.war.battle_odds import (
+    roll_battle,
+    band_odds,
+    momentum_odds,
+    simulate_chain,
+    summarize,
+    forecast_war,
+)
+from dice import run_dice
 from config import GM_ROLE_NAME
-from utils import interpret_roll, normalize_name
+from utils import interpret_roll, did_you_mean, roll_momentum, normalize_name, parse_rows
+from paginator import PaginatorView
 from checks import is_gm_check
 import datetime
-import random
 from typing import Optional, Literal
 
 # === /declarewar Command ===
@@ -32,7 +41,6 @@ async def declarewar(
     defender_emoji: str = "\U0001f7e6",
 ):
 
-    wars = load_wars()
     new_war = {
         "name": name,
         "attacker": attacker,
@@ -44,8 +52,11 @@ async def declarewar(
         "status": "active",
         "started_at": str(datetime.date.today()),
     }
-    wars["wars"].append(new_war)
-    save_wars(wars)
+    if not war_registry.declare(new_war):
+        await interaction.response.send_message(
+            f"⚠️ The Archivist already records a war named **{name}**.", ephemeral=True
+        )
+        return
 
     await interaction.response.send_message(
         f"👮 **The Archivist records a new war...**\n"
@@ -82,20 +93,16 @@ async def resolvebattle(
     modifier: int = 0,
     roll_mode: Optional[Literal["Advantage", "Disadvantage", "None"]] = "None",
 ):
-    roll_1 = random.randint(1, 10)
-    roll_2 = random.randint(1, 10)
+    rolls, base_roll, final_roll = roll_battle(modifier, roll_mode)
+    shown = ", ".join(map(str, rolls))
 
     if roll_mode == "Advantage":
-        base_roll = max(roll_1, roll_2)
-        roll_explanation = f"🎲 Rolls: {roll_1}, {roll_2} → Chose higher"
+        roll_explanation = f"🎲 Rolls: {shown} → Chose higher"
     elif roll_mode == "Disadvantage":
-        base_roll = min(roll_1, roll_2)
-        roll_explanation = f"🎲 Rolls: {roll_1}, {roll_2} → Chose lower"
+        roll_explanation = f"🎲 Rolls: {shown} → Chose lower"
     else:
-        base_roll = roll_1
-        roll_explanation = f"🎲 Roll: {roll_1}"
+        roll_explanation = f"🎲 Roll: {shown}"
 
-    final_roll = max(1, min(10, base_roll + modifier))
     outcome = interpret_roll(final_roll)
     war_title = war.replace("_", " ").title() if war else "Independent Engagement"
 
@@ -117,6 +124,226 @@ resolvebattle_cmd = app_commands.Command(
     callback=resolvebattle,
 )
 
+# === /resolvebattles Command ===
+ENGAGEMENT_FIELDS = ("attacker", "defender", "modifier", "roll_mode")
+ROLL_MODE_NAMES = {"advantage": "Advantage", "adv": "Advantage", "disadvantage": "Disadvantage", "dis": "Disadvantage"}
+ENGAGEMENTS_PER_PAGE = 10
+
+
+def _engagement(war, row):
+    """Validate one engagement row: ((attacker, defender, modifier, mode, sign), None) or (None, error).
+
+    ``sign`` is -1 when the war's defender is the one attacking, so the
+    momentum swing is always measured toward the war's attacker.
+    """
+    attacker = row["attacker"] or war["attacker"]
+    if normalize_name(attacker) == normalize_name(war["defender"]):
+        attacker, sign, other = war["defender"], -1, war["attacker"]
+    else:
+        sign, other = 1, war["defender"]
+    defender = row["defender"] or other
+    try:
+        modifier = int(row["modifier"] or 0)
+    except (TypeError, ValueError):
+        return None, f"modifier `{row['modifier']}` is not a whole number"
+    mode = str(row["roll_mode"] or "None").strip()
+    mode = ROLL_MODE_NAMES.get(mode.lower(), mode)
+    if mode not in ("Advantage", "Disadvantage", "None"):
+        return None, f"roll mode must be Advantage, Disadvantage or None, not `{mode}`"
+    return (attacker, defender, modifier, mode, sign), None
+
+
+@is_gm_check()
+@app_commands.describe(
+    war="The war these engagements belong to",
+    engagements="Rows of attacker, defender, modifier, roll mode separated by ';' (e.g. North Army, Fort Kells, 2, Advantage)",
+    apply="Apply the net momentum change to the war",
+)
+async def resolvebattles(
+    interaction: discord.Interaction,
+    war: str,
+    engagements: str,
+    apply: bool = False,
+):
+    # Applying writes to the war, so then only the exact name will do
+    if apply:
+        found = war_registry.get(war, status="active")
+    else:
+        found = war_registry.resolve(war, status="active")
+    if not found:
+        await interaction.response.send_message(
+            "❌ No active war found."
+            + did_you_mean(war_registry.closest(war, status="active")),
+            ephemeral=True,
+        )
+        return
+
+    lines, errors, net = [], [], 0
+    for number, row, error in parse_rows(engagements.replace(";", "\n"), ENGAGEMENT_FIELDS):
+        if error is None:
+            parsed, error = _engagement(found, row)
+        if error:
+            errors.append(f"Row {number}: {error}")
+            continue
+        attacker, defender, modifier, mode, sign = parsed
+        rolls, _, final_roll = roll_battle(modifier, mode)
+        swing = sign * roll_momentum(final_roll)
+        net += swing
+        rolls = ", ".join(map(str, rolls)) + (f" ({mode})" if mode != "None" else "")
+        lines.append(
+            f"⚔️ **{attacker}** vs **{defender}** — 🎲 {rolls} {modifier:+} → "
+            f"**{final_roll}** {interpret_roll(final_roll)} | {swing:+}"
+        )
+
+    if not lines:
+        await interaction.response.send_message(
+            "❌ No valid engagements.\n" + "\n".join(errors[:10]), ephemeral=True
+        )
+        return
+
+    momentum = found.get("momentum", 0)
+    if apply and net:
+        # Re-read right before writing; no await in between, so nothing can interleave
+        current = war_registry.get(found["name"], status="active")
+        if current:
+            updated = war_registry.update(found["name"], momentum=current["momentum"] + net)
+            momentum = updated["momentum"]
+        else:
+            apply = False
+
+    summary = f"📈 Net momentum: **{net:+}**"
+    if apply and net:
+        summary += f" — applied, momentum is now {momentum:+}"
+    elif net:
+        summary += " (not applied)"
+    pages = []
+    for start in range(0, len(lines), ENGAGEMENTS_PER_PAGE):
+        embed = discord.Embed(
+            title=f"📜 {found['name']}: {len(lines)} engagements",
+            description="\n".join(lines[start:start + ENGAGEMENTS_PER_PAGE]) + "\n\n" + summary,
+            color=discord.Color.dark_red(),
+        )
+        if errors:
+            embed.add_field(
+                name=f"⚠️ {len(errors)} row(s) skipped", value="\n".join(errors)[:1000], inline=False
+            )
+        pages.append(embed)
+
+    await PaginatorView(pages, author_id=interaction.user.id).send(interaction)
+
+
+resolvebattles_cmd = app_commands.Command(
+    name="resolvebattles",
+    description="Resolve many engagements of one war at once.",
+    callback=resolvebattles,
+)
+
+# === /battleodds Command ===
+
+
+@app_commands.describe(
+    modifier="Modifier applied to the roll",
+    roll_mode="Roll mode: Advantage, Disadvantage, or None",
+    battles="Number of back-to-back battles to simulate (1 = exact odds)",
+    samples="Simulated chains when battles > 1",
+)
+async def battleodds(
+    interaction: discord.Interaction,
+    modifier: int = 0,
+    roll_mode: Optional[Literal["Advantage", "Disadvantage", "None"]] = "None",
+    battles: app_commands.Range[int, 1, 50] = 1,
+    samples: app_commands.Range[int, 1000, 2_000_000] = 200_000,
+):
+    roll_mode = roll_mode or "None"
+    header = f"🎲 **Battle odds** — modifier {modifier:+}, roll mode {roll_mode}\n\n"
+
+    if battles == 1:
+        lines = [
+            f"`{band:>2}` {interpret_roll(band)}: **{p:.0%}** ({roll_momentum(band):+} momentum)"
+            for band, p in enumerate(band_odds(modifier, roll_mode), 1)
+            if p
+        ]
+        swings = " | ".join(f"{shift:+}: {p:.0%}" for shift, p in momentum_odds(modifier, roll_mode).items())
+        await interaction.response.send_message(header + "\n".join(lines) + f"\n\n📈 Momentum: {swings}")
+        return
+
+    # Sampling a long chain can take a moment; keep it off the event loop
+    await interaction.response.defer()
+    outcomes = await run_dice(simulate_chain, [(modifier, roll_mode)] * battles, samples)
+    samples = sum(outcomes.values())  # long chains run fewer samples
+    gains, even, losses, mean = summarize(outcomes)
+    common = ", ".join(f"{net:+} ({n / samples:.1%})" for net, n in outcomes.most_common(5))
+    await interaction.followup.send(
+        header
+        + f"⚔️ After **{battles}** battles ({samples:,} simulations):\n"
+        f"🎯 Attacker gains momentum: **{gains:.1%}**\n"
+        f"⚖️ No net change: **{even:.1%}**\n"
+        f"🛡️ Defender gains momentum: **{losses:.1%}**\n"
+        f"📈 Expected net momentum: **{mean:+.2f}**\n"
+        f"🔢 Most likely results: {common}"
+    )
+
+
+battleodds_cmd = app_commands.Command(
+    name="battleodds",
+    description="Show the odds of each battle outcome for a modifier and roll mode.",
+    callback=battleodds,
+)
+
+# === /forecastwar Command ===
+
+
+@app_commands.describe(
+    war="The active war to forecast",
+    modifier="Modifier the attacker is expected to roll with",
+    roll_mode="Roll mode: Advantage, Disadvantage, or None",
+    simulations="Number of simulated wars",
+)
+async def forecastwar(
+    interaction: discord.Interaction,
+    war: str,
+    modifier: int = 0,
+    roll_mode: Optional[Literal["Advantage", "Disadvantage", "None"]] = "None",
+    simulations: app_commands.Range[int, 1000, 1_000_000] = 100_000,
+):
+    found = war_registry.resolve(war, status="active")
+    if not found:
+        await interaction.response.send_message(
+            "❌ No active war found."
+            + did_you_mean(war_registry.closest(war, status="active")),
+            ephemeral=True,
+        )
+        return
+
+    intensity = found.get("intensity", 5)
+    momentum = max(-intensity, min(intensity, found.get("momentum", 0)))
+    roll_mode = roll_mode or "None"
+
+    await interaction.response.defer()
+    forecast = await forecast_war(momentum, intensity, modifier, roll_mode, simulations)
+    decided = forecast.attacker_wins + forecast.defender_wins
+    simulations = decided + forecast.unresolved  # high intensities run fewer
+    expected_turns = f"{forecast.turns / decided:.1f}" if decided else "—"
+
+    message = (
+        f"🔮 **Forecast: {found['name']}**\n"
+        f"{found['attacker_emoji']} {found['attacker']} vs {found['defender']} {found['defender_emoji']}\n"
+        f"📆 Intensity: {intensity} | 📈 Momentum: {momentum:+} | 🔧 {modifier:+} {roll_mode}\n\n"
+        f"🎯 {found['attacker']} wins: **{forecast.attacker_wins / simulations:.1%}**\n"
+        f"🛡️ {found['defender']} wins: **{forecast.defender_wins / simulations:.1%}**\n"
+        f"⏳ Expected battles to resolution: **{expected_turns}**"
+    )
+    if forecast.unresolved:
+        message += f"\n❔ Still undecided after the simulation limit: {forecast.unresolved / simulations:.1%}"
+    await interaction.followup.send(message + f"\n\n*{simulations:,} simulated wars*")
+
+
+forecastwar_cmd = app_commands.Command(
+    name="forecastwar",
+    description="Estimate how an active war is likely to end.",
+    callback=forecastwar,
+)
+
 # === /updatewar Command ===
 
 
@@ -125,17 +352,20 @@ resolvebattle_cmd = app_commands.Command(
     name="Name of the war", change="Momentum adjustment (positive or negative)"
 )
 async def updatewar(interaction: discord.Interaction, name: str, change: int):
-    wars = load_wars()
-    for war in wars["wars"]:
-        if war["name"].lower() == name.lower() and war["status"] == "active":
-            war["momentum"] += change
-            save_wars(wars)
-            await interaction.response.send_message(
-                f"⚖️ Updated **{war['name']}** momentum to {war['momentum']}."
-            )
-            return
+    updated = None
+    war = war_registry.get(name, status="active")
+    if war:
+        updated = war_registry.update(name, momentum=war["momentum"] + change)
+
+    if updated:
+        await interaction.response.send_message(
+            f"⚖️ Updated **{updated['name']}** momentum to {updated['momentum']}."
+        )
+        return
     await interaction.response.send_message(
-        "❌ No active war by that name found.", ephemeral=True
+        "❌ No active war by that name found."
+        + did_you_mean(war_registry.closest(name, status="active")),
+        ephemeral=True,
     )
 
 
@@ -166,27 +396,32 @@ async def editwar(
     new_attacker_emoji: Optional[str] = None,
     new_defender_emoji: Optional[str] = None,
 ):
-    wars = load_wars()
-    for war in wars["wars"]:
-        if war["name"].lower() == name.lower() and war["status"] == "active":
-            if new_attacker:
-                war["attacker"] = new_attacker
-            if new_defender:
-                war["defender"] = new_defender
-            if new_intensity:
-                war["intensity"] = max(1, min(20, new_intensity))
-            if new_attacker_emoji:
-                war["attacker_emoji"] = new_attacker_emoji
-            if new_defender_emoji:
-                war["defender_emoji"] = new_defender_emoji
-            save_wars(wars)
-            await interaction.response.send_message(
-                f"✏️ Updated **{war['name']}**.\n"
-                f"Now {war['attacker_emoji']} **{war['attacker']}** vs {war['defender']} {war['defender_emoji']} | Intensity: {war['intensity']}"
-            )
-            return
+    updated = None
+    if war_registry.get(name, status="active"):
+        changes = {}
+        if new_attacker:
+            changes["attacker"] = new_attacker
+        if new_defender:
+            changes["defender"] = new_defender
+        if new_intensity:
+            changes["intensity"] = max(1, min(20, new_intensity))
+        if new_attacker_emoji:
+            changes["attacker_emoji"] = new_attacker_emoji
+        if new_defender_emoji:
+            changes["defender_emoji"] = new_defender_emoji
+        updated = war_registry.update(name, **changes)
+
+    if updated:
+        war = updated
+        await interaction.response.send_message(
+            f"✏️ Updated **{war['name']}**.\n"
+            f"Now {war['attacker_emoji']} **{war['attacker']}** vs {war['defender']} {war['defender_emoji']} | Intensity: {war['intensity']}"
+        )
+        return
     await interaction.response.send_message(
-        "❌ War not found or inactive.", ephemeral=True
+        "❌ War not found or inactive."
+        + did_you_mean(war_registry.closest(name, status="active")),
+        ephemeral=True,
     )
 
 
@@ -201,18 +436,10 @@ editwar_cmd = app_commands.Command(
 
 @resolvebattle_cmd.autocomplete("attacker")
 async def attacker_autocomplete(interaction: discord.Interaction, current: str):
-    wars = load_wars()
     war_name = getattr(interaction.namespace, "war", None)
 
     if war_name:
-        war = next(
-            (
-                w
-                for w in wars["wars"]
-                if w["name"].lower() == war_name.lower() and w["status"] == "active"
-            ),
-            None,
-        )
+        war = war_registry.get(war_name, status="active")
         if war:
             return [
                 app_commands.Choice(name=war["attacker"], value=war["attacker"]),
@@ -227,22 +454,25 @@ async def defender_autocomplete(interaction: discord.Interaction, current: str):
 
 
 @resolvebattle_cmd.autocomplete("war")
+@forecastwar_cmd.autocomplete("war")
+@resolvebattles_cmd.autocomplete("war")
 @updatewar_cmd.autocomplete("name")
 @editwar_cmd.autocomplete("name")
 async def war_autocomplete(interaction: discord.Interaction, current: str):
-    wars = load_wars()
     return [
-        app_commands.Choice(name=w["name"], value=w["name"])
-        for w in wars["wars"]
-        if w["status"] == "active" and current.lower() in w["name"].lower()
-    ][:25]
+        app_commands.Choice(name=name, value=name)
+        for name in war_registry.search(current, status="active")
+    ]
 
 
 # === Setup Function ===
 
 
-def setup(bot: commands.Bot):
+async def setup(bot: commands.Bot):
     bot.tree.add_command(declarewar_cmd)
     bot.tree.add_command(resolvebattle_cmd)
+    bot.tree.add_command(resolvebattles_cmd)
+    bot.tree.add_command(battleodds_cmd)
+    bot.tree.add_command(forecastwar_cmd)
     bot.tree.add_command(updatewar_cmd)
     bot.tree.add_command(editwar_cmd)
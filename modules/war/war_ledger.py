@@ -1,36 +1,159 @@
+import datetime
+from collections import OrderedDict
+from typing import Literal, Optional
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from modules.war.war_utils import load_wars, save_wars
+from modules.war.war_registry import war_registry
+from modules.war.war_utils import war_key
 from config import GM_ROLE_NAME
 from checks import is_gm_check
+from utils import did_you_mean, normalize_name
+from paginator import PaginatorView
 
 # === /warledger Command ===
+WARS_PER_PAGE = 8
+PAGE_CACHE_SIZE = 64
+
+SORT_KEYS = {
+    "declared": None,  # ledger order, across active and closed wars
+    "name": lambda war: war["name"].lower(),
+    "started": lambda war: war.get("started_at", ""),
+    "intensity": lambda war: -war.get("intensity", 0),
+    "momentum": lambda war: -abs(war.get("momentum", 0)),
+}
+
+_page_cache = OrderedDict()  # (revision, query, page) -> rendered embed
+_list_cache = OrderedDict()  # (revision, query) -> filtered, sorted wars
+
+
+def ledger_wars(query):
+    """Wars matching ``query`` = (status, participant, started_after, started_before, sort).
+
+    Works on the registry's in-memory views and is cached per registry
+    revision, so paging and re-sorting never touch the file.
+    """
+    war_registry.active()  # picks up hand edits to warlog.json, bumping the revision
+    key = (war_registry.revision, query)
+    if key in _list_cache:
+        _list_cache.move_to_end(key)
+        return _list_cache[key]
+
+    status, participant, after, before, sort = query
+    if status == "active":
+        wars = list(war_registry.active())
+    elif status == "closed":
+        wars = list(war_registry.closed())
+    else:
+        wars = war_registry.all()
+    if participant:
+        needle = normalize_name(participant)
+        wars = [w for w in wars if needle in normalize_name(w["attacker"]) or needle in normalize_name(w["defender"])]
+    if after:
+        wars = [w for w in wars if w.get("started_at", "") >= after]
+    if before:
+        wars = [w for w in wars if w.get("started_at", "") <= before]
+    if SORT_KEYS[sort] is None:
+        positions = war_registry.positions()
+        wars.sort(key=lambda war: positions[war_key(war["name"])])
+    else:
+        wars.sort(key=SORT_KEYS[sort])
+
+    _list_cache[key] = wars
+    if len(_list_cache) > PAGE_CACHE_SIZE:
+        _list_cache.popitem(last=False)
+    return wars
+
+
+class LedgerPages:
+    """Lazily rendered ledger pages; each is built on first view and cached
+    until the registry's revision moves on."""
+
+    def __init__(self, query):
+        self.query = query
+        self.wars = ledger_wars(query)
+        self.revision = war_registry.revision
+
+    def __len__(self):
+        return max(1, -(-len(self.wars) // WARS_PER_PAGE))
+
+    def __getitem__(self, page):
+        war_registry.active()
+        if war_registry.revision != self.revision:
+            # The ledger changed while the pages were open: show fresh data
+            self.revision = war_registry.revision
+            self.wars = ledger_wars(self.query)
+            page = min(page, len(self) - 1)
+
+        key = (self.revision, self.query, page)
+        embed = _page_cache.get(key)
+        if embed is None:
+            embed = self._render(page)
+            _page_cache[key] = embed
+            if len(_page_cache) > PAGE_CACHE_SIZE:
+                _page_cache.popitem(last=False)
+        else:
+            _page_cache.move_to_end(key)
+        return embed.copy()
+
+    def _render(self, page):
+        embed = discord.Embed(
+            title="📚 The Archivist's War Ledger",
+            description=f"{len(self.wars)} war(s)",
+            color=discord.Color.dark_gold(),
+        )
+        for war in self.wars[page * WARS_PER_PAGE:(page + 1) * WARS_PER_PAGE]:
+            status = "✅ Closed" if war["status"] == "closed" else "🔥 Active"
+            end = war.get("ended_at", "Ongoing")
+            embed.add_field(
+                name=f"{war['name']} ({status})",
+                value=(
+                    f"{war['attacker']} vs {war['defender']}\n"
+                    f"Intensity: {war['intensity']} | Momentum: {war.get('momentum', 0):+}\n"
+                    f"Dates: {war['started_at']} - {end}"
+                ),
+                inline=False,
+            )
+        return embed
+
+
+def _iso_date(text):
+    if not text:
+        return None
+    return datetime.date.fromisoformat(text.strip()).isoformat()
+
+
+@app_commands.describe(
+    status="Which wars to list",
+    participant="(Optional) Only wars involving this nation",
+    started_after="(Optional) Only wars begun on or after this date (YYYY-MM-DD)",
+    started_before="(Optional) Only wars begun on or before this date (YYYY-MM-DD)",
+    sort="Order of the list",
+)
+async def warledger(
+    interaction: discord.Interaction,
+    status: Literal["active", "closed", "all"] = "active",
+    participant: Optional[str] = None,
+    started_after: Optional[str] = None,
+    started_before: Optional[str] = None,
+    sort: Literal["declared", "name", "started", "intensity", "momentum"] = "declared",
+):
+    try:
+        after, before = _iso_date(started_after), _iso_date(started_before)
+    except ValueError:
+        await interaction.response.send_message("❌ Dates must look like 2025-06-16.", ephemeral=True)
+        return
 
-
-@app_commands.describe(show_closed="Include closed wars in the list?")
-async def warledger(interaction: discord.Interaction, show_closed: bool = False):
-    wars = load_wars()
-    visible = [w for w in wars["wars"] if show_closed or w["status"] == "active"]
-
-    if not visible:
+    pages = LedgerPages((status, (participant or "").strip(), after, before, sort))
+    if not pages.wars:
         await interaction.response.send_message(
             "📖 No wars found in the Archivist's records."
         )
         return
 
-    message = "📚 **The Archivist's War Ledger:**\n"
-    for war in visible:
-        status = "✅ Closed" if war["status"] == "closed" else "🔥 Active"
-        end = war.get("ended_at", "Ongoing")
-        message += (
-            f"\n• **{war['name']}** ({status})\n"
-            f"  {war['attacker']} vs {war['defender']}\n"
-            f"  Intensity: {war['intensity']} | Dates: {war['started_at']} - {end}\n"
-        )
-
-    await interaction.response.send_message(message)
+    await PaginatorView(pages, author_id=interaction.user.id).send(interaction)
 
 
 warledger_cmd = app_commands.Command(
@@ -45,18 +168,16 @@ warledger_cmd = app_commands.Command(
 @is_gm_check()
 @app_commands.describe(war_name="The name of the war to permanently delete")
 async def deletewar(interaction: discord.Interaction, war_name: str):
-    wars = load_wars()
-    war_name_cleaned = war_name.strip().lower()
-    before = len(wars["wars"])
-    wars["wars"] = [w for w in wars["wars"] if w["name"].lower() != war_name_cleaned]
-    after = len(wars["wars"])
+    removed = war_registry.remove(war_name)
 
-    if before == after:
+    if not removed:
+        # Suggest only: deletion is permanent, so never guess
         await interaction.response.send_message(
-            "⚠️ No war by that name found to delete.", ephemeral=True
+            "⚠️ No war by that name found to delete."
+            + did_you_mean(war_registry.closest(war_name)),
+            ephemeral=True,
         )
     else:
-        save_wars(wars)
         await interaction.response.send_message(
             f"🗑️ War **{war_name}** has been permanently removed from the records."
         )
@@ -71,17 +192,15 @@ deletewar_cmd = app_commands.Command(
 
 @deletewar_cmd.autocomplete("war_name")
 async def deletewar_autocomplete(interaction: discord.Interaction, current: str):
-    wars = load_wars()
     return [
-        app_commands.Choice(name=w["name"], value=w["name"])
-        for w in wars["wars"]
-        if current.lower() in w["name"].lower()
-    ][:25]
+        app_commands.Choice(name=name, value=name)
+        for name in war_registry.search(current)
+    ]
 
 
 # === Setup ===
 
 
-def setup(bot: commands.Bot):
+async def setup(bot: commands.Bot):
     bot.tree.add_command(warledger_cmd)
     bot.tree.add_command(deletewar_cmd)
@@ -0,0 +1,182 @@
+from modules.war.war_utils import war_store, war_key
+from search_index import SearchIndex
+
+
+class WarRegistry:
+    """Indexed view over the war ledger.
+
+    Wars are keyed by ``war_key`` (one matching rule for every command) and
+    split into active and closed views that are kept up to date as wars are
+    declared, edited and deleted, so lookups never scan ``wars["wars"]``.
+    The index is rebuilt only when the store reloads the ledger. Name search
+    indexes for autocomplete (all wars, and active wars) are maintained
+    alongside. ``revision`` goes up on every change, and subscribers hear
+    about each one.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._generation = None
+        self._positions = {}  # key -> index in wars["wars"]
+        self._active = {}     # key -> war, in declaration order
+        self._closed = {}
+        self._search_all = SearchIndex()
+        self._search_active = SearchIndex()
+        self._listeners = []
+        self.revision = 0
+
+    # === Change Hooks ===
+    def subscribe(self, callback):
+        """Call ``callback(war)`` after a war is declared, edited or removed,
+        or ``callback(None)`` when the whole ledger was reloaded."""
+        self._listeners.append(callback)
+
+    def _changed(self, war):
+        self.revision += 1
+        for callback in self._listeners:
+            callback(war)
+
+    # === Index Maintenance ===
+    def _sync(self):
+        wars = self.store.all()  # may reload warlog.json after a hand edit
+        if self.store.generation != self._generation:
+            self._rebuild(wars["wars"])
+        return wars
+
+    def _rebuild(self, records):
+        self._positions = {}
+        self._active = {}
+        self._closed = {}
+        for position, war in enumerate(records):
+            key = war_key(war["name"])
+            # Duplicate names in old ledgers: an active war wins over a closed one
+            if key in self._active and war.get("status") != "active":
+                continue
+            self._active.pop(key, None)
+            self._closed.pop(key, None)
+            self._positions[key] = position
+            self._view(war)[key] = war
+        self._search_all.rebuild(w["name"] for w in (*self._active.values(), *self._closed.values()))
+        self._search_active.rebuild(w["name"] for w in self._active.values())
+        self._generation = self.store.generation
+        self._changed(None)
+
+    def _file(self, key, war):
+        self._view(war)[key] = war
+        self._search_all.add(war["name"])
+        if war.get("status") == "active":
+            self._search_active.add(war["name"])
+
+    def _view(self, war):
+        return self._active if war.get("status") == "active" else self._closed
+
+    def _forget(self, key):
+        war = self._active.pop(key, None) or self._closed.pop(key, None)
+        if war is not None:
+            self._search_all.remove(war["name"])
+            self._search_active.remove(war["name"])
+
+    # === Reads ===
+    def get(self, name, status=None):
+        self._sync()
+        key = war_key(name)
+        if status == "active":
+            return self._active.get(key)
+        if status == "closed":
+            return self._closed.get(key)
+        return self._active.get(key) or self._closed.get(key)
+
+    def active(self):
+        self._sync()
+        return self._active.values()
+
+    def closed(self):
+        self._sync()
+        return self._closed.values()
+
+    def all(self):
+        return [*self.active(), *self.closed()]
+
+    def positions(self):
+        """{war key: index in the ledger}, i.e. declaration order."""
+        self._sync()
+        return dict(self._positions)
+
+    def search(self, query, status=None):
+        """War names for autocomplete; prefix matches first, at most 25."""
+        return self._index(status).search(query)
+
+    def resolve(self, name, status=None):
+        """The war ``name`` clearly refers to (typos allowed), or None."""
+        match = self._index(status).resolve(name)
+        return self.get(match, status) if match else None
+
+    def closest(self, name, status=None):
+        """Closest war names, for "did you mean" replies."""
+        return self._index(status).closest(name)
+
+    def _index(self, status):
+        self._sync()
+        return self._search_active if status == "active" else self._search_all
+
+    # === Writes ===
+    def declare(self, war):
+        """Record a new war; returns False if the name is already taken."""
+        wars = self._sync()
+        key = war_key(war["name"])
+        if key in self._positions:
+            return False
+        self.store.append(["wars"], war)
+        self._positions[key] = len(wars["wars"]) - 1
+        self._file(key, war)
+        self._changed(war)
+        return True
+
+    def update(self, name, /, **changes):
+        """Apply field changes to a war; returns the updated war or None."""
+        self._sync()
+        key = war_key(name)
+        position = self._positions.get(key)
+        if position is None:
+            return None
+        if "name" in changes:
+            new_key = war_key(changes["name"])
+            if new_key != key and new_key in self._positions:
+                raise ValueError(f"A war named {changes['name']!r} already exists.")
+
+        war = self.store.all()["wars"][position]
+        refile = "name" in changes or "status" in changes
+        if refile:
+            self._forget(key)  # before the edit, while the old name is known
+            del self._positions[key]
+
+        for field, value in changes.items():
+            self.store.set(["wars", position, field], value)
+
+        if refile:
+            # Re-file under the new name and/or the right status view
+            new_key = war_key(war["name"])
+            self._positions[new_key] = position
+            self._file(new_key, war)
+        self._changed(war)
+        return war
+
+    def remove(self, name):
+        """Delete a war from the ledger; returns the removed war or None."""
+        wars = self._sync()
+        key = war_key(name)
+        position = self._positions.pop(key, None)
+        if position is None:
+            return None
+        war = wars["wars"][position]
+        self.store.delete(["wars", position])
+        self._forget(key)
+        # Later wars shifted down by one
+        for other, other_position in self._positions.items():
+            if other_position > position:
+                self._positions[other] = other_position - 1
+        self._changed(war)
+        return war
+
+
+war_registry = WarRegistry(war_store)
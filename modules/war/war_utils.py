@@ -1,17 +1,37 @@
-import json
-import os
+from storage import JsonStore, ListTable, DocumentRow
+from utils import normalize_name
 
 # Use absolute path for Railway compatibility
 WAR_LOG_PATH = "/data/warlog.json"
+DASHBOARD_PATH = "/data/war_dashboards.json"
+
+war_store = JsonStore(
+    WAR_LOG_PATH,
+    default=lambda: {"wars": []},
+    indent=2,
+    layout=ListTable("wars", "wars"),
+    # Re-read only when warlog.json's (mtime, size, inode) changes, so hand
+    # edits are still picked up while steady-state reads cost one stat()
+    validate_reads=True,
+)
+
+# Lives here rather than in the war_view extension so reloading it never
+# opens a second store on the same file
+dashboard_store = JsonStore(
+    DASHBOARD_PATH,
+    default=dict,  # channel id -> dashboard message id
+    indent=2,
+    layout=DocumentRow("war_dashboards"),
+)
 
 def load_wars():
-    """Loads wars from the JSON file. Returns an empty list if the file does not exist."""
-    if not os.path.exists(WAR_LOG_PATH):
-        return {"wars": []}
-    with open(WAR_LOG_PATH, "r") as f:
-        return json.load(f)
+    """Returns the in-memory war ledger, loading it on first use."""
+    return war_store.all()
 
 def save_wars(data):
-    """Saves wars to the JSON file in a nicely formatted way."""
-    with open(WAR_LOG_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+    """Marks the war ledger dirty; it is written on the next flush."""
+    war_store.replace(data)
+
+def war_key(name):
+    """The one canonical form used to match war names across every command."""
+    return normalize_name(name.strip())
@@ -1,38 +1,49 @@
+import asyncio
+import time
+from functools import lru_cache
+
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from modules.war.war_utils import load_wars
-from utils import normalize_name
+from modules.war.war_registry import war_registry
+from modules.war.war_utils import dashboard_store
+from checks import is_gm_check
+from utils import did_you_mean
+
+# Discord allows about five edits per message every five seconds; stay well under
+DASHBOARD_EDIT_INTERVAL = 5.0
+MESSAGE_LIMIT = 2000
+
+
+# === War Bar Rendering ===
+@lru_cache(maxsize=1024)
+def render_bar(intensity, momentum, attacker_emoji, defender_emoji):
+    """The war bar for a momentum, clamped to +-intensity."""
+    momentum = max(-intensity, min(intensity, momentum))
+    half = (intensity * 2 + 1) // 2
+    return f"{attacker_emoji * (half + momentum)}⚔️{defender_emoji * (half - momentum)}"
+
+
+def war_bar(war):
+    intensity = war.get("intensity", 5)
+    momentum = max(-intensity, min(intensity, war.get("momentum", 0)))
+    return render_bar(intensity, momentum, war["attacker_emoji"], war["defender_emoji"]), intensity, momentum
 
 
 # === /warbar Command ===
 async def warbar(interaction: discord.Interaction, war_name: str):
-    wars = load_wars()
-    war_name_cleaned = normalize_name(war_name)
-    war = next(
-        (
-            w
-            for w in wars["wars"]
-            if normalize_name(w["name"]) == war_name_cleaned and w["status"] == "active"
-        ),
-        None,
-    )
+    war = war_registry.resolve(war_name, status="active")
 
     if not war:
         await interaction.response.send_message(
-            "❌ No active war found.", ephemeral=True
+            "❌ No active war found."
+            + did_you_mean(war_registry.closest(war_name, status="active")),
+            ephemeral=True,
         )
         return
 
-    intensity = war.get("intensity", 5)
-    momentum = max(-intensity, min(intensity, war.get("momentum", 0)))
-    total_slots = intensity * 2 + 1
-    half = total_slots // 2
-
-    attacker_tiles = war["attacker_emoji"] * (half + momentum)
-    defender_tiles = war["defender_emoji"] * (half - momentum)
-    bar = f"{attacker_tiles}⚔️{defender_tiles}"
+    bar, intensity, momentum = war_bar(war)
 
     await interaction.response.send_message(
         f"📊 **{war['name'].title()}**\n"
@@ -50,17 +61,148 @@ warbar_cmd = app_commands.Command(
 )
 
 
+# === Live War Dashboard ===
+def render_dashboard():
+    wars = list(war_registry.active())
+    if not wars:
+        return "📊 **War Dashboard**\n\n🕊️ No active wars."
+
+    text = "📊 **War Dashboard**\n"
+    for shown, war in enumerate(wars):
+        bar, intensity, momentum = war_bar(war)
+        block = (
+            f"\n**{war['name']}** — {war['attacker']} vs {war['defender']}\n"
+            f"{bar}  ({momentum:+}/{intensity})\n"
+        )
+        more = f"\n*…and {len(wars) - shown} more.*"
+        if len(text) + len(block) + len(more) > MESSAGE_LIMIT:
+            return text + more
+        text += block
+    return text
+
+
+class WarDashboard:
+    """Keeps one pinned message per opted-in channel showing every active war.
+
+    Registry changes only mark dashboards dirty. Each message gets at most
+    one pending edit, sent no sooner than DASHBOARD_EDIT_INTERVAL after its
+    last edit and rendered at send time, so a burst of momentum changes
+    becomes a single edit.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.bot = None
+        self._pending = {}    # channel id -> scheduled edit task
+        self._last_edit = {}  # channel id -> monotonic time of last edit
+
+    def on_war_change(self, war):
+        if self.bot is None or not self.store.all():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for channel_id in list(self.store.all()):
+            if channel_id not in self._pending:
+                self._pending[channel_id] = asyncio.create_task(self._edit_later(channel_id))
+
+    async def _edit_later(self, channel_id):
+        try:
+            wait = self._last_edit.get(channel_id, 0) + DASHBOARD_EDIT_INTERVAL - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        finally:
+            # Changes from here on schedule a fresh edit
+            self._pending.pop(channel_id, None)
+        await self.refresh(channel_id)
+
+    async def refresh(self, channel_id):
+        message_id = self.store.all().get(channel_id)
+        if message_id is None:
+            return
+        self._last_edit[channel_id] = time.monotonic()
+        try:
+            channel = self.bot.get_channel(int(channel_id)) or await self.bot.fetch_channel(int(channel_id))
+            await channel.get_partial_message(message_id).edit(content=render_dashboard())
+        except discord.NotFound:
+            # Message or channel is gone: stop tracking it
+            self.store.delete([channel_id])
+        except discord.HTTPException as e:
+            print(f"⚠️ Could not update war dashboard in {channel_id}: {e}")
+
+    async def enable(self, channel):
+        message = await channel.send(render_dashboard())
+        try:
+            await message.pin()
+        except discord.HTTPException as e:
+            print(f"⚠️ Could not pin war dashboard in {channel.id}: {e}")
+        old = self.store.all().get(str(channel.id))
+        self.store.set([str(channel.id)], message.id)
+        self._last_edit[str(channel.id)] = time.monotonic()
+        return old
+
+    def disable(self, channel_id):
+        message_id = self.store.all().get(str(channel_id))
+        if message_id is not None:
+            self.store.delete([str(channel_id)])
+        return message_id
+
+
+war_dashboard = WarDashboard(dashboard_store)
+war_registry.subscribe(war_dashboard.on_war_change)
+
+
+@is_gm_check()
+@app_commands.describe(enable="Post a live dashboard here (or stop updating it)")
+async def wardashboard(interaction: discord.Interaction, enable: bool = True):
+    channel = interaction.channel
+    if not enable:
+        message_id = war_dashboard.disable(channel.id)
+        if message_id is None:
+            await interaction.response.send_message("ℹ️ This channel has no war dashboard.", ephemeral=True)
+            return
+        try:
+            await channel.get_partial_message(message_id).unpin()
+        except discord.HTTPException:
+            pass
+        await interaction.response.send_message("🛑 The war dashboard here will no longer update.", ephemeral=True)
+        return
+
+    await interaction.response.defer(ephemeral=True)
+    old = await war_dashboard.enable(channel)
+    if old is not None:
+        try:
+            await channel.get_partial_message(old).delete()
+        except discord.HTTPException:
+            pass
+    await interaction.followup.send("📊 War dashboard posted; it updates as wars change.", ephemeral=True)
+
+
+wardashboard_cmd = app_commands.Command(
+    name="wardashboard",
+    description="[GM] Post a live war dashboard in this channel, edited in place.",
+    callback=wardashboard,
+)
+
+
 # Autocomplete for warbar
 @warbar_cmd.autocomplete("war_name")
 async def warbar_autocomplete(interaction: discord.Interaction, current: str):
-    wars = load_wars()
     return [
-        app_commands.Choice(name=w["name"], value=w["name"])
-        for w in wars["wars"]
-        if w["status"] == "active" and current.lower() in w["name"].lower()
-    ][:25]
+        app_commands.Choice(name=name, value=name)
+        for name in war_registry.search(current, status="active")
+    ]
 
 
 # Setup function
-def setup(bot: commands.Bot):
+async def setup(bot: commands.Bot):
+    war_dashboard.bot = bot
     bot.tree.add_command(warbar_cmd)
+    bot.tree.add_command(wardashboard_cmd)
+
+
+async def teardown(bot: commands.Bot):
+    # A reload builds a new dashboard; this one stays subscribed to the
+    # registry, so stop it from editing messages
+    war_dashboard.bot = None
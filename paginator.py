@@ -0,0 +1,74 @@
+# paginator.py
+
+import discord
+
+PAGE_TIMEOUT = 180
+
+
+class PaginatorView(discord.ui.View):
+    """Previous/next buttons over a sequence of embeds.
+
+    ``pages`` only needs ``len()`` and indexing, so a lazy sequence that
+    renders a page on first access works as well as a list. Only the user
+    who ran the command can turn the pages.
+    """
+
+    def __init__(self, pages, author_id=None, timeout=PAGE_TIMEOUT):
+        super().__init__(timeout=timeout)
+        self.pages = pages
+        self.author_id = author_id
+        self.page = 0
+        self.message = None
+        self._refresh_buttons()
+
+    async def send(self, interaction, ephemeral=False):
+        """Send the first page (buttons only when there is more than one)."""
+        kwargs = {"embed": self._current(), "ephemeral": ephemeral}
+        if len(self.pages) > 1:
+            kwargs["view"] = self
+        if interaction.response.is_done():
+            self.message = await interaction.followup.send(wait=True, **kwargs)
+        else:
+            await interaction.response.send_message(**kwargs)
+            self.message = await interaction.original_response()
+
+    def _current(self):
+        embed = self.pages[self.page]
+        if self.page >= len(self.pages):
+            # Lazy pages can shrink while open (e.g. wars deleted): stay in range
+            self.page = len(self.pages) - 1
+            embed = self.pages[self.page]
+        self._refresh_buttons()
+        if len(self.pages) > 1:
+            embed.set_footer(text=f"Page {self.page + 1}/{len(self.pages)}")
+        return embed
+
+    def _refresh_buttons(self):
+        self.previous.disabled = self.page == 0
+        self.next.disabled = self.page >= len(self.pages) - 1
+
+    async def interaction_check(self, interaction):
+        if self.author_id is None or interaction.user.id == self.author_id:
+            return True
+        await interaction.response.send_message("❌ These pages belong to someone else.", ephemeral=True)
+        return False
+
+    async def _turn(self, interaction, step):
+        self.page = max(0, min(len(self.pages) - 1, self.page + step))
+        embed = self._current()
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous(self, interaction, button):
+        await self._turn(interaction, -1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next(self, interaction, button):
+        await self._turn(interaction, 1)
+
+    async def on_timeout(self):
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
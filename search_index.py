@@ -0,0 +1,322 @@
+# search_index.py
+
+import heapq
+
+from utils import normalize_name
+
+AUTOCOMPLETE_LIMIT = 25  # Discord's autocomplete limit
+MAX_GRAM = 3
+
+
+def max_typos(text):
+    """Edit distance still treated as "the same name" for a query this long."""
+    return 1 if len(text) < 5 else 2
+
+
+# === Edit Distance ===
+def distance_to(pattern):
+    """Compile ``pattern`` into a Levenshtein distance function.
+
+    Uses the bit-parallel Myers/Hyyrö algorithm: one pass of integer ops per
+    character of the other string, with the pattern's bitmasks built once
+    so a BK-tree query can reuse them at every node.
+    """
+    m = len(pattern)
+    if m == 0:
+        return len
+
+    peq = {}
+    for i, ch in enumerate(pattern):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+
+    def distance(text):
+        pv, mv, score = full, 0, m
+        for ch in text:
+            eq = peq.get(ch, 0)
+            xv = eq | mv
+            xh = ((((eq & pv) + pv) & full) ^ pv) | eq
+            ph = mv | (~(xh | pv) & full)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+            ph = ((ph << 1) | 1) & full
+            mh = (mh << 1) & full
+            pv = mh | (~(xv | ph) & full)
+            mv = ph & xv
+        return score
+
+    return distance
+
+
+def transposition_distance(a, b):
+    """Optimal string alignment distance: Levenshtein plus swapping two
+    adjacent letters as a single edit ("gual" -> "gaul" is 1)."""
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class BKTree:
+    """Burkhard-Keller tree over strings under Levenshtein distance.
+
+    A query within distance ``k`` only descends into children whose edge
+    distance lies in ``[d - k, d + k]``, so it touches a small fraction of
+    the names. Removals are tombstoned and the tree is rebuilt once they
+    outnumber the live entries.
+    """
+
+    def __init__(self, words=()):
+        self._root = None
+        self._live = set()
+        self._dead = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if word in self._live:
+            return
+        self._live.add(word)
+        if self._root is None:
+            self._root = (word, {})
+            return
+
+        node = self._root
+        while True:
+            d = distance_to(word)(node[0])
+            if d == 0:
+                return  # tombstoned earlier; it's live again
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = (word, {})
+                return
+            node = child
+
+    def remove(self, word):
+        if word not in self._live:
+            return
+        self._live.discard(word)
+        self._dead += 1
+        if self._dead > len(self._live):
+            words, self._root, self._live, self._dead = list(self._live), None, set(), 0
+            for w in words:
+                self.add(w)
+
+    def search(self, query, max_distance):
+        """All live words within ``max_distance``, as sorted (distance, word)."""
+        if self._root is None:
+            return []
+        distance = distance_to(query)
+        found = []
+        stack = [self._root]
+        while stack:
+            word, children = stack.pop()
+            d = distance(word)
+            if d <= max_distance and word in self._live:
+                found.append((d, word))
+            for edge in range(d - max_distance, d + max_distance + 1):
+                child = children.get(edge)
+                if child is not None:
+                    stack.append(child)
+        found.sort()
+        return found
+
+
+def _deletions(text):
+    """``text`` plus every string one character shorter than it."""
+    return {text} | {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+class _TrieNode:
+    __slots__ = ("children", "names")
+
+    def __init__(self):
+        self.children = {}
+        self.names = set()
+
+
+class SearchIndex:
+    """Name index for autocomplete.
+
+    A trie answers prefix queries and an n-gram index (1- to 3-grams of the
+    normalized name) answers substring queries. Prefix hits are ranked above
+    substring hits and the search stops as soon as it has ``limit`` results.
+    The index is updated in place on add/remove/rename, so a keystroke never
+    walks the full name list.
+    """
+
+    def __init__(self, names=()):
+        self.rebuild(names)
+
+    def rebuild(self, names):
+        self._root = _TrieNode()
+        self._grams = {}
+        self._normalized = {}
+        self._by_key = {}
+        self._fuzzy = BKTree()
+        self._deletes = {}
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._normalized)
+
+    # === Updates ===
+    def add(self, name):
+        if name in self._normalized:
+            return
+        key = normalize_name(name)
+        self._normalized[name] = key
+        if key not in self._by_key:
+            self._fuzzy.add(key)
+            for variant in _deletions(key):
+                self._deletes.setdefault(variant, set()).add(key)
+        self._by_key.setdefault(key, set()).add(name)
+
+        node = self._root
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+        node.names.add(name)
+
+        for gram in _grams(key):
+            self._grams.setdefault(gram, set()).add(name)
+
+    def remove(self, name):
+        key = self._normalized.pop(name, None)
+        if key is None:
+            return
+
+        same_key = self._by_key[key]
+        same_key.discard(name)
+        if not same_key:
+            del self._by_key[key]
+            self._fuzzy.remove(key)
+            for variant in _deletions(key):
+                bucket = self._deletes[variant]
+                bucket.discard(key)
+                if not bucket:
+                    del self._deletes[variant]
+
+        path = [self._root]
+        for ch in key:
+            path.append(path[-1].children[ch])
+        path[-1].names.discard(name)
+        # Prune branches that no longer lead to any name
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.names or node.children:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+
+        for gram in _grams(key):
+            bucket = self._grams.get(gram)
+            if bucket is not None:
+                bucket.discard(name)
+                if not bucket:
+                    del self._grams[gram]
+
+    def rename(self, old, new):
+        self.remove(old)
+        self.add(new)
+
+    # === Queries ===
+    def search(self, query, limit=AUTOCOMPLETE_LIMIT):
+        query = normalize_name(query)
+        results = self._prefix(query, limit)
+        if len(results) < limit and query:
+            seen = set(results)
+            extra = (n for n in self._substring(query) if n not in seen)
+            results.extend(heapq.nsmallest(limit - len(results), extra, key=self._normalized.get))
+        if not results and query:
+            # Nothing contains the text: offer near-miss spellings instead
+            results = self.closest(query, limit)
+        return results
+
+    def _near_keys(self, key):
+        """Normalized names within typo distance, as sorted (distance, key).
+
+        Single-deletion neighbourhoods meet for every one-edit typo and for
+        swapped letters, which covers almost all real misspellings with a
+        handful of dict lookups. They are ranked by transposition distance,
+        so a swap counts as one typo. Only when that finds nothing does the
+        BK-tree run the full (Levenshtein) distance search.
+        """
+        limit = max_typos(key)
+        candidates = set()
+        for variant in _deletions(key):
+            candidates.update(self._deletes.get(variant, ()))
+        matches = sorted((transposition_distance(key, c), c) for c in candidates)
+        matches = [(d, c) for d, c in matches if d <= limit]
+        return matches or self._fuzzy.search(key, limit)
+
+    def closest(self, query, limit=3):
+        """Names within typo distance of ``query``, nearest first."""
+        names = []
+        for _, match in self._near_keys(normalize_name(query)):
+            names.extend(sorted(self._by_key[match]))
+            if len(names) >= limit:
+                break
+        return names[:limit]
+
+    def resolve(self, query):
+        """Map a possibly misspelt name to the one it clearly refers to.
+
+        Exact names win, then a unique case/underscore-insensitive match,
+        then a unique nearest name within typo distance. Returns None when
+        there is no match or it is ambiguous.
+        """
+        if query in self._normalized:
+            return query
+
+        key = normalize_name(query)
+        names = self._by_key.get(key)
+        if names:
+            return next(iter(names)) if len(names) == 1 else None
+
+        matches = self._near_keys(key)
+        if not matches:
+            return None
+        best = [match for d, match in matches if d == matches[0][0]]
+        if len(best) == 1 and len(self._by_key[best[0]]) == 1:
+            return next(iter(self._by_key[best[0]]))
+        return None
+
+    def _prefix(self, query, limit):
+        node = self._root
+        for ch in query:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+
+        results = []
+        stack = [node]
+        while stack and len(results) < limit:
+            node = stack.pop()
+            results.extend(sorted(node.names)[: limit - len(results)])
+            # Reverse-sorted push so the smallest child is visited first
+            stack.extend(node.children[ch] for ch in sorted(node.children, reverse=True))
+        return results
+
+    def _substring(self, query):
+        if len(query) <= MAX_GRAM:
+            return self._grams.get(query, ())
+
+        buckets = [self._grams.get(g) for g in _grams(query, sizes=(MAX_GRAM,))]
+        if not all(buckets):
+            return ()
+        candidates = min(buckets, key=len)
+        return (n for n in candidates if query in self._normalized[n])
+
+
+def _grams(text, sizes=range(1, MAX_GRAM + 1)):
+    return {text[i:i + n] for n in sizes for i in range(len(text) - n + 1)}
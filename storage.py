@@ -0,0 +1,747 @@
+# storage.py
+
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import STORAGE_BACKEND, SQLITE_PATH
+from utils import normalize_name
+
+# Write-behind tuning: dirty state is written once the window closes, or
+# immediately once this many writes have piled up.
+FLUSH_DELAY = 2.0
+FLUSH_THRESHOLD = 50
+
+# Journal records kept before they are folded back into the snapshot.
+COMPACT_THRESHOLD = 500
+
+# Disk work never runs on the event loop; it goes through this bounded pool.
+IO_WORKERS = 4
+_io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="storage-io")
+
+_stores = []
+
+
+async def run_io(func, *args, **kwargs):
+    """Run blocking disk work in the storage thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_pool, functools.partial(func, *args, **kwargs))
+
+
+def _atomic_write(path, write):
+    """Write to a temp file beside ``path`` and rename it into place.
+
+    A crash mid-write leaves the previous file untouched instead of a
+    truncated ledger.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write_json(path, data, indent=None):
+    _atomic_write(path, lambda f: json.dump(data, f, indent=indent))
+
+
+def atomic_write_text(path, text):
+    _atomic_write(path, lambda f: f.write(text))
+
+
+def file_signature(path):
+    """(mtime_ns, size, inode) of ``path``, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+# === Journal Records ===
+# Each mutation is a small record addressed by a path from the document
+# root, e.g. {"op": "set", "path": ["Eoghain", "economy", "value"], "value": 80}.
+def apply_op(doc, op):
+    path = op["path"]
+    target = doc
+    for key in path[:-1]:
+        target = target[key]
+
+    kind = op["op"]
+    if kind == "set":
+        target[path[-1]] = op["value"]
+    elif kind == "del":
+        del target[path[-1]]
+    elif kind == "append":
+        target[path[-1]].append(op["value"])
+    else:
+        raise ValueError(f"Unknown journal op: {kind}")
+
+
+# === JSON Snapshot + Journal Backend ===
+class JournalFile:
+    """Persists a document as ``<path>`` plus an append-only ``<path>.journal``.
+
+    Mutations are appended as one JSON line each, so their cost scales with
+    the change rather than the world. Once the journal grows past
+    ``COMPACT_THRESHOLD`` records it is folded back into the snapshot.
+    """
+
+    def __init__(self, path, indent=None):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.indent = indent
+        self._pending = []
+        self._journal_len = None  # None: no journal matching the snapshot
+        self.needs_snapshot = False
+
+    def load(self, default):
+        data, state = self.read(default)
+        self.adopt(state)
+        return data
+
+    def read(self, default):
+        """Parse the snapshot and replay its journal, without touching this
+        backend's state; returns (data, state) for ``adopt``."""
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                blob = f.read()
+            data = json.loads(blob)
+            digest = hashlib.sha256(blob).hexdigest()
+        else:
+            data, digest = default(), None
+        return data, self._replay_journal(data, digest)
+
+    def adopt(self, state):
+        self._pending = []
+        self._journal_len, self.needs_snapshot, orphaned = state
+        if orphaned:
+            self._set_aside()
+
+    def _replay_journal(self, data, digest):
+        """(records replayed or None, needs_snapshot, orphaned)."""
+        if not os.path.exists(self.journal_path):
+            return None, False, False
+
+        with open(self.journal_path, "r") as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = {}
+            if "sha256" in header:
+                matches = header["sha256"] == digest
+            else:  # journals written before content hashes
+                matches = "base" in header and header["base"] == file_signature(self.path)
+            if not matches:
+                # The snapshot was replaced behind our back (restore, copy,
+                # hand edit), or we crashed mid-compaction
+                return None, True, any(line.strip() for line in f)
+
+            count, needs_snapshot = 0, False
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    # Torn tail from a crash; rewrite a clean snapshot
+                    needs_snapshot = True
+                    break
+                apply_op(data, op)
+                count += 1
+        return count, needs_snapshot, False
+
+    def _set_aside(self):
+        """Keep a journal that no longer matches its snapshot instead of dropping it."""
+        target = self.journal_path + ".orphaned"
+        if os.path.exists(target):
+            target += f".{int(time.time())}"
+        os.replace(self.journal_path, target)
+        print(
+            f"⚠️ {self.path} no longer matches its journal; the unreplayed changes "
+            f"were kept in {target}. Check whether they are missing from the file."
+        )
+
+    def signature(self):
+        # Only the snapshot is checked: the journal is ours alone, while GMs
+        # may hand-edit the snapshot
+        return file_signature(self.path)
+
+    def record(self, op):
+        # Serialize now so later in-place edits can't leak into the record
+        self._pending.append(json.dumps(op))
+
+    def pending(self):
+        return len(self._pending)
+
+    def prepare(self, data, snapshot=False, compact=False):
+        """Capture what needs writing and return it as a job for the IO pool.
+
+        Runs on the event loop, so the captured state is consistent; the
+        returned callable does the disk work and is safe to run in a thread.
+        """
+        if not self._pending and not snapshot and not self.needs_snapshot:
+            if compact and self._journal_len:
+                return self._prepare_snapshot(data)
+            return None
+
+        if (
+            compact
+            or snapshot
+            or self.needs_snapshot
+            or self._journal_len is None
+            or self._journal_len + len(self._pending) >= COMPACT_THRESHOLD
+        ):
+            return self._prepare_snapshot(data)
+
+        lines, self._pending = self._pending, []
+        self._journal_len += len(lines)
+        return functools.partial(self._append_journal, lines)
+
+    def _prepare_snapshot(self, data):
+        # The C encoder makes this copy cheap; pretty-printing happens off-loop
+        blob = json.dumps(data)
+        self._pending = []
+        self.needs_snapshot = False
+        self._journal_len = 0
+        return functools.partial(self._write_snapshot, blob)
+
+    def _append_journal(self, lines):
+        with open(self.journal_path, "a") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_snapshot(self, blob):
+        """Fold the journal into a fresh snapshot and start a new journal."""
+        text = blob if self.indent is None else json.dumps(json.loads(blob), indent=self.indent)
+        atomic_write_text(self.path, text)
+        # The header ties the journal to this exact snapshot content, so a
+        # crash before it is rewritten can't replay records twice, while a
+        # byte-identical copy of the snapshot still matches
+        with open(self.journal_path, "w") as f:
+            f.write(json.dumps({"sha256": hashlib.sha256(text.encode()).hexdigest()}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+# === SQLite Backend ===
+_connections = {}
+_db_lock = threading.RLock()  # stores share one connection across IO threads
+
+
+def _connect(db_path):
+    with _db_lock:  # stores open concurrently at startup
+        conn = _connections.get(db_path)
+        if conn is None:
+            conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _connections[db_path] = conn
+        return conn
+
+
+class EntityTable:
+    """SQLite layout for a dict of named records (the country ledger)."""
+
+    def __init__(self, table):
+        self.table = table
+        self.key = table
+        self._touched = set()
+
+    def create(self, conn):
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "name TEXT PRIMARY KEY, norm_name TEXT NOT NULL, data TEXT NOT NULL)"
+        )
+        # Every read is served from memory, so secondary indexes only cost writes
+        conn.execute(f"DROP INDEX IF EXISTS idx_{self.table}_norm_name")
+
+    def is_empty(self, conn):
+        return conn.execute(f"SELECT 1 FROM {self.table} LIMIT 1").fetchone() is None
+
+    def read(self, conn, default):
+        data = default()
+        for name, blob in conn.execute(f"SELECT name, data FROM {self.table}"):
+            data[name] = json.loads(blob)
+        return data
+
+    def touch(self, op):
+        self._touched.add(op["path"][0])
+
+    def pending(self):
+        return len(self._touched)
+
+    def changes(self, data):
+        statements = []
+        for name in self._touched:
+            if name in data:
+                statements.append(self._upsert(name, data[name]))
+            else:
+                statements.append((f"DELETE FROM {self.table} WHERE name = ?", (name,)))
+        self._touched = set()
+        return statements
+
+    def snapshot(self, data):
+        statements = [(f"DELETE FROM {self.table}", ())]
+        statements.extend(self._upsert(name, record) for name, record in data.items())
+        self._touched = set()
+        return statements
+
+    def _upsert(self, name, record):
+        return (
+            f"INSERT INTO {self.table} (name, norm_name, data) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET norm_name = excluded.norm_name, data = excluded.data",
+            (name, normalize_name(name), json.dumps(record)),
+        )
+
+
+class ListTable:
+    """SQLite layout for ``{field: [records]}`` (the war ledger).
+
+    Rows get a stable id so list positions can shift without rewriting the
+    table; ``name`` and ``status`` are broken out for querying the database
+    by hand.
+    """
+
+    def __init__(self, table, field):
+        self.table = table
+        self.key = table
+        self.field = field
+        self._ids = []
+        self._next_id = 1
+        self._touched = set()
+
+    def create(self, conn):
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "id INTEGER PRIMARY KEY, name TEXT, norm_name TEXT, status TEXT, "
+            "data TEXT NOT NULL)"
+        )
+        # Every read is served from memory, so secondary indexes only cost writes
+        conn.execute(f"DROP INDEX IF EXISTS idx_{self.table}_norm_name")
+        conn.execute(f"DROP INDEX IF EXISTS idx_{self.table}_status")
+
+    def is_empty(self, conn):
+        return conn.execute(f"SELECT 1 FROM {self.table} LIMIT 1").fetchone() is None
+
+    def read(self, conn, default):
+        data = default()
+        records = data[self.field]
+        self._ids = []
+        for row_id, blob in conn.execute(f"SELECT id, data FROM {self.table} ORDER BY id"):
+            self._ids.append(row_id)
+            records.append(json.loads(blob))
+        self._next_id = (self._ids[-1] + 1) if self._ids else 1
+        return data
+
+    def touch(self, op):
+        path = op["path"]
+        if op["op"] == "append":
+            self._ids.append(self._next_id)
+            self._touched.add(self._next_id)
+            self._next_id += 1
+        elif op["op"] == "del" and len(path) == 2:
+            self._touched.add(self._ids.pop(path[1]))
+        else:
+            self._touched.add(self._ids[path[1]])
+
+    def pending(self):
+        return len(self._touched)
+
+    def changes(self, data):
+        live = {
+            row_id: record
+            for row_id, record in zip(self._ids, data[self.field])
+            if row_id in self._touched
+        }
+        statements = []
+        for row_id in self._touched:
+            if row_id in live:
+                statements.append(self._upsert(row_id, live[row_id]))
+            else:
+                statements.append((f"DELETE FROM {self.table} WHERE id = ?", (row_id,)))
+        self._touched = set()
+        return statements
+
+    def snapshot(self, data):
+        self._ids = list(range(1, len(data[self.field]) + 1))
+        self._next_id = len(self._ids) + 1
+        statements = [(f"DELETE FROM {self.table}", ())]
+        statements.extend(
+            self._upsert(row_id, record)
+            for row_id, record in zip(self._ids, data[self.field])
+        )
+        self._touched = set()
+        return statements
+
+    def _upsert(self, row_id, record):
+        name = record.get("name", "")
+        return (
+            f"INSERT OR REPLACE INTO {self.table} (id, name, norm_name, status, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (row_id, name, normalize_name(name), record.get("status"), json.dumps(record)),
+        )
+
+
+class DocumentRow:
+    """SQLite layout for a small document kept whole in one row (turn state)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.key = name
+        self._touched = False
+
+    def create(self, conn):
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+        )
+
+    def is_empty(self, conn):
+        row = conn.execute("SELECT 1 FROM documents WHERE name = ?", (self.name,)).fetchone()
+        return row is None
+
+    def read(self, conn, default):
+        row = conn.execute("SELECT data FROM documents WHERE name = ?", (self.name,)).fetchone()
+        return json.loads(row[0]) if row else default()
+
+    def touch(self, op):
+        self._touched = True
+
+    def pending(self):
+        return int(self._touched)
+
+    def changes(self, data):
+        return self.snapshot(data) if self._touched else []
+
+    def snapshot(self, data):
+        self._touched = False
+        return [(
+            "INSERT OR REPLACE INTO documents (name, data) VALUES (?, ?)",
+            (self.name, json.dumps(data)),
+        )]
+
+
+class SqliteTables:
+    """Persists a document as SQLite rows described by ``layout``.
+
+    Every flush is one transaction touching only the rows that changed.
+    On first use an empty table is filled from the existing JSON file; a
+    marker row in ``documents`` records that, so emptying the table later
+    never brings the old file back.
+    """
+
+    def __init__(self, db_path, layout, import_path=None):
+        self.db_path = db_path
+        self.layout = layout
+        self.import_path = import_path
+        self._ready = False
+
+    def _open(self):
+        conn = _connect(self.db_path)
+        if not self._ready:
+            with _db_lock:
+                self.layout.create(conn)
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS documents (name TEXT PRIMARY KEY, data TEXT NOT NULL)"
+                )
+            self._ready = True
+        return conn
+
+    def load(self, default):
+        conn = self._open()
+        with _db_lock:
+            marker = f"imported:{self.layout.key}"
+            if conn.execute("SELECT 1 FROM documents WHERE name = ?", (marker,)).fetchone() is None:
+                # Databases from before the marker count as imported once they hold rows
+                if self.layout.is_empty(conn) and self.import_path and os.path.exists(self.import_path):
+                    self.import_json(default)
+                else:
+                    self._execute([self._import_marker()])
+            return self.layout.read(conn, default)
+
+    def import_json(self, default):
+        """Copy the JSON snapshot (plus journal) at ``import_path`` into SQLite."""
+        data = JournalFile(self.import_path).load(default)
+        self._execute(self.layout.snapshot(data) + [self._import_marker()])
+        return data
+
+    def _import_marker(self):
+        return (
+            "INSERT OR REPLACE INTO documents (name, data) VALUES (?, ?)",
+            (f"imported:{self.layout.key}", json.dumps(self.import_path)),
+        )
+
+    def signature(self):
+        return None  # the database is only written through this process
+
+    def record(self, op):
+        self.layout.touch(op)
+
+    def pending(self):
+        return self.layout.pending()
+
+    def prepare(self, data, snapshot=False, compact=False):
+        """Build the row statements on the loop; execute them in the IO pool."""
+        if snapshot:
+            statements = self.layout.snapshot(data)
+        elif self.layout.pending():
+            statements = self.layout.changes(data)
+        else:
+            return None
+        return functools.partial(self._execute, statements)
+
+    def _execute(self, statements):
+        conn = self._open()
+        with _db_lock:
+            conn.execute("BEGIN")
+            try:
+                for sql, params in statements:
+                    conn.execute(sql, params)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+
+def make_backend(path, indent=None, layout=None):
+    """Pick the persistence backend configured by ``STORAGE_BACKEND``."""
+    if STORAGE_BACKEND == "sqlite" and layout is not None:
+        return SqliteTables(SQLITE_PATH, layout, import_path=path)
+    return JournalFile(path, indent=indent)
+
+
+# === In-memory Store ===
+class JsonStore:
+    """An in-memory JSON document with grouped, write-behind persistence.
+
+    Targeted mutations (``set``/``delete``/``append``) are applied in memory
+    and handed to the backend as small records. ``save()`` is for changes
+    made directly to the document; it forces a full snapshot on the next
+    flush. Either way nothing touches disk until the flush window closes or
+    ``FLUSH_THRESHOLD`` writes are pending, and the write itself runs in the
+    IO pool rather than on the event loop.
+
+    Reads and mutations are synchronous and in memory, so a read-modify-write
+    with no ``await`` in between can't interleave with another command and
+    needs no lock.
+    """
+
+    def __init__(self, path, default, indent=None, layout=None, validate_reads=False):
+        self.path = path
+        self.default = default
+        self.backend = make_backend(path, indent=indent, layout=layout)
+        self.validate_reads = validate_reads
+        self._data = None
+        self._signature = None
+        self.generation = 0  # bumped whenever the document is (re)loaded or replaced
+        self._listeners = []
+        self._needs_snapshot = False
+        self._timer = None
+        self._flush_task = None
+        self._reload_task = None
+        self._io_lock = asyncio.Lock()
+        _stores.append(self)
+
+    # === Loading ===
+    def _read(self):
+        # Signature first: an edit landing mid-read is caught on the next check
+        signature = self.backend.signature()
+        return self.backend.load(self.default), signature
+
+    def load(self):
+        self._data, self._signature = self._read()
+        self._needs_snapshot = False
+        self.generation += 1
+        self._notify(None)
+        return self._data
+
+    async def aload(self):
+        """Load the document in the IO pool instead of blocking the loop."""
+        data, signature = await run_io(self._read)
+        self._data, self._signature = data, signature
+        self._needs_snapshot = False
+        self.generation += 1
+        self._notify(None)
+        return data
+
+    def all(self):
+        if self._data is None:
+            self.load()
+        elif self.validate_reads and self._changed_on_disk():
+            self._reload_later()
+        return self._data
+
+    def _reload_later(self):
+        """Pick up an outside edit without parsing on the event loop; readers
+        keep getting the copy in memory until the new one is in."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self.load()  # no event loop (scripts): read straight away
+            return
+        if self._reload_task is None or self._reload_task.done():
+            self._reload_task = asyncio.ensure_future(self._reload())
+
+    async def _reload(self):
+        signature, generation = self._signature, self.generation
+        try:
+            data, state, new_signature = await run_io(self._read_detached)
+        except Exception as e:
+            print(f"❌ Failed to reload {self.path}: {e}")
+            return
+        if (
+            self._signature != signature
+            or self.generation != generation
+            or self.backend.pending()
+            or self._needs_snapshot
+        ):
+            return  # we wrote meanwhile; memory wins, as for any unflushed change
+        self.backend.adopt(state)
+        self._data, self._signature = data, new_signature
+        self.generation += 1
+        self._notify(None)
+
+    def _read_detached(self):
+        signature = self.backend.signature()
+        data, state = self.backend.read(self.default)
+        return data, state, signature
+
+    def _changed_on_disk(self):
+        """True if someone else rewrote the file since we last read or wrote it.
+
+        Costs a single ``stat()``. Skipped while we hold unwritten changes,
+        since memory is then ahead of the file by design.
+        """
+        if self._needs_snapshot or self.backend.pending() or self._io_lock.locked():
+            return False
+        return self.backend.signature() != self._signature
+
+    # === Change Notifications ===
+    def subscribe(self, callback):
+        """Call ``callback(op)`` after every mutation, or ``callback(None)``
+        when the whole document was loaded or replaced."""
+        self._listeners.append(callback)
+
+    def _notify(self, op):
+        for callback in self._listeners:
+            callback(op)
+
+    # === Mutations ===
+    def set(self, path, value):
+        self._record({"op": "set", "path": list(path), "value": value})
+
+    def delete(self, path):
+        self._record({"op": "del", "path": list(path)})
+
+    def append(self, path, value):
+        self._record({"op": "append", "path": list(path), "value": value})
+
+    def _record(self, op):
+        apply_op(self.all(), op)
+        self.backend.record(op)
+        self._notify(op)
+        self._schedule()
+
+    def replace(self, data):
+        self._data = data
+        self.generation += 1
+        self._notify(None)
+        self.save()
+
+    def save(self):
+        self._needs_snapshot = True
+        self._schedule()
+
+    def _schedule(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts): write straight away
+            self.flush()
+            return
+
+        if self.backend.pending() >= FLUSH_THRESHOLD:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(FLUSH_DELAY, self._start_flush)
+
+    def _start_flush(self):
+        self._timer = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self.aflush())
+
+    # === Persistence ===
+    def _prepare(self, compact):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._data is None:
+            return None
+        # A file GMs hand-edit must always be current, so it is snapshotted on
+        # every flush. That json.dumps runs here, on the loop (the capture must
+        # be consistent), so keep validate_reads to small documents like the
+        # war ledger
+        compact = compact or self.validate_reads
+        job = self.backend.prepare(self._data, snapshot=self._needs_snapshot, compact=compact)
+        self._needs_snapshot = False
+        return job
+
+    async def aflush(self, compact=False):
+        # One write per store at a time, so journal appends stay in order
+        async with self._io_lock:
+            job = self._prepare(compact)
+            if job is None:
+                return
+            try:
+                self._signature = await run_io(self._run_job, job)
+            except Exception as e:
+                # Those records left memory; rewrite everything next time
+                self._needs_snapshot = True
+                print(f"❌ Failed to persist {self.path}: {e}")
+
+        # Writes that arrived during a slow flush found it still running and
+        # were not scheduled; pick them up now
+        if self.backend.pending() or self._needs_snapshot:
+            self._schedule()
+
+    def _run_job(self, job):
+        job()
+        return self.backend.signature()
+
+    def flush(self, compact=False):
+        """Write synchronously; only for callers without an event loop."""
+        job = self._prepare(compact)
+        if job is not None:
+            self._signature = self._run_job(job)
+
+
+async def load_all():
+    """Load every store concurrently through the IO pool (startup).
+
+    Returns ``{path: seconds}`` for each store's load.
+    """
+    async def timed(store):
+        started = time.perf_counter()
+        await store.aload()
+        return store.path, time.perf_counter() - started
+
+    return dict(await asyncio.gather(*(timed(store) for store in _stores)))
+
+
+async def flush_all():
+    """Force every store to disk and compact it (shutdown, /startturn)."""
+    for store in _stores:
+        await store.aflush(compact=True)
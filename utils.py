@@ -1,5 +1,8 @@
 # utils.py
 
+import csv
+import io
+import itertools
 import json
 import os
 import datetime
@@ -35,9 +38,82 @@ def interpret_roll(result):
     return outcomes.get(result, "Invalid result")
 
 
+# Momentum swing toward the attacker for each interpret_roll band. Bands b
+# and 11 - b swing by opposite amounts, so an even battle expects no change
+MOMENTUM_SHIFTS = {1: -1, 2: -1, 3: -1, 4: 0, 5: 0, 6: 0, 7: 0, 8: 1, 9: 1, 10: 1}
+
+
+def roll_momentum(result):
+    return MOMENTUM_SHIFTS.get(result, 0)
+
+
 def normalize_name(name: str) -> str:
     return name.replace("_", " ").lower()
 
 
+def did_you_mean(names) -> str:
+    """Suffix for "not found" replies, e.g. " Did you mean **Eoghain**?"."""
+    if not names:
+        return ""
+    return " Did you mean " + " or ".join(f"**{n}**" for n in names) + "?"
+
+
+def parse_rows(source, fields):
+    """Parse CSV or JSON-lines input into rows keyed by ``fields``.
+
+    ``source`` is a string or any iterable of lines (an open file streams
+    without being read into memory). JSON lines are detected by a leading
+    ``{``. CSV may carry a header row (any order of ``fields``); without
+    one, columns are taken positionally. Yields ``(line_number, row,
+    error)`` with exactly one of row/error set, so one bad line never stops
+    the rest.
+    """
+    lines = io.StringIO(source) if isinstance(source, str) else iter(source)
+
+    # Peek at the first non-blank line to pick the format, then replay it
+    head = []
+    for line in lines:
+        head.append(line.lstrip("\ufeff") if not head else line)
+        if line.strip():
+            break
+    stream = itertools.chain(head, lines)
+
+    if head and head[-1].lstrip().startswith("{"):
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, None, f"invalid JSON ({e.msg})"
+                continue
+            if not isinstance(row, dict):
+                yield number, None, "expected a JSON object"
+                continue
+            yield number, {k: row.get(k) for k in fields}, None
+        return
+
+    header = None
+    seen_first = False
+    reader = csv.reader(stream)
+    for cells in reader:
+        number = reader.line_num
+        cells = [c.strip() for c in cells]
+        if not any(cells):
+            continue
+        if not seen_first:
+            seen_first = True
+            names = [c.lower() for c in cells]
+            if all(name in fields for name in names):
+                header = names
+                continue
+        keys = header or fields
+        if len(cells) > len(keys):
+            yield number, None, f"expected at most {len(keys)} columns, got {len(cells)}"
+            continue
+        row = dict(zip(keys, cells))
+        yield number, {k: row.get(k) for k in fields}, None
+
+
 def setup_logging():
     print("🛠 Logging initialized.")